@@ -1,3 +1,4 @@
+import httpx
 import requests
 
 from core.config import settings
@@ -6,14 +7,24 @@ from core.config import settings
 API_URL = "https://back.aisha.group/api/v1/stt/post/"
 API_KEY = settings.AISHA_API_KEY
 
+# Shared session keeps the TCP/TLS connection alive between calls
+session = requests.Session()
+session.headers.update({"x-api-key": API_KEY})
+
+# Async counterpart for request handlers, closed on application shutdown
+async_client = httpx.AsyncClient(
+    headers={"x-api-key": API_KEY},
+    timeout=60,
+    limits=httpx.Limits(max_keepalive_connections=20),
+)
+
 
 def stt(audio: any, title: str, has_diarization: True, language: str = "uz"):
-    headers = {"x-api-key": API_KEY}
     files = {"audio": audio}
     data = {"title": title, "has_diarization": "false", "language": language}
     # Force has_diarization to False, since API is shit
 
-    response = requests.post(API_URL, headers=headers, files=files, data=data)
+    response = session.post(API_URL, files=files, data=data, timeout=30)
 
     print(response.status_code)
     print(response.json())
@@ -24,6 +35,19 @@ def stt(audio: any, title: str, has_diarization: True, language: str = "uz"):
     return response.json()
 
 
+async def stt_async(audio: tuple, title: str, language: str = "uz") -> dict:
+    """Non-blocking stt() without diarization over the shared async client."""
+    files = {"audio": audio}
+    data = {"title": title, "has_diarization": "false", "language": language}
+
+    response = await async_client.post(API_URL, files=files, data=data)
+
+    if response.status_code != 200:
+        return {}
+
+    return response.json()
+
+
 if __name__ == "__main__":
     audio = open("../tests/call-center-tbc.mp3", mode="rb")
     print(audio)
@@ -6,43 +6,59 @@ Segments audio by diarization timestamps and transcribes each segment,
 directly mapping transcriptions to speakers.
 """
 
+import asyncio
 from io import BytesIO
-from typing import List, Dict, Any
-from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Any
 
-import requests
-from pydub import AudioSegment
+import httpx
 from loguru import logger
 
+from ai import cache
+from ai.audio_utils import (
+    SAMPLE_RATE,
+    SAMPLE_WIDTH,
+    decode_to_pcm,
+    merge_consecutive_speakers,
+    pcm_to_wav,
+    slice_pcm,
+)
 from core.config import settings
 
 
 API_URL = "https://back.aisha.group/api/v1/stt/post/"
 
 
-def transcribe_segment(audio_segment: AudioSegment, segment_index: int, language: str = "uz") -> str:
+async def transcribe_segment(
+    client: httpx.AsyncClient,
+    wav_audio: bytes,
+    segment_index: int,
+    language: str = "uz",
+) -> str:
     """
     Transcribe a single audio segment using AISHA API.
 
     Args:
-        audio_segment: pydub AudioSegment to transcribe
+        client: Shared async HTTP client (connection pool)
+        wav_audio: WAV file (mono PCM16) to transcribe
         segment_index: Index for logging/debugging
         language: Language code (uz, ru, etc.)
 
     Returns:
         Transcribed text string
     """
-    # Export segment to WAV in memory
-    wav_buffer = BytesIO()
-    audio_segment.export(wav_buffer, format="wav")
-    wav_buffer.seek(0)
-
-    headers = {"x-api-key": settings.AISHA_API_KEY}
-    files = {"audio": (f"segment_{segment_index}.wav", wav_buffer, "audio/wav")}
+    # Repeated audio such as IVR prompts or hold music skips the API round-trip
+    key = cache.make_key("aisha", language, wav_audio)
+    cached = cache.get(key)
+    if cached is not None:
+        logger.debug(f"Segment {segment_index} transcription served from cache")
+        return cached
+
+    # httpx streams the multipart body part by part, the WAV bytes are not copied again
+    files = {"audio": (f"segment_{segment_index}.wav", wav_audio, "audio/wav")}
     data = {"title": f"segment_{segment_index}", "has_diarization": "false", "language": language}
 
     try:
-        response = requests.post(API_URL, headers=headers, files=files, data=data, timeout=30)
+        response = await client.post(API_URL, files=files, data=data)
 
         if response.status_code != 200:
             logger.warning(f"AISHA API error for segment {segment_index}: {response.status_code}")
@@ -51,7 +67,9 @@ def transcribe_segment(audio_segment: AudioSegment, segment_index: int, language
         result = response.json()
         text = result.get("text", "") or result.get("transcript", "") or ""
         logger.debug(f"Segment {segment_index} transcribed: {len(text)} chars")
-        return text.strip()
+        text = text.strip()
+        cache.put(key, text)
+        return text
 
     except Exception as e:
         logger.error(f"AISHA API error for segment {segment_index}: {e}")
@@ -61,11 +79,11 @@ def transcribe_segment(audio_segment: AudioSegment, segment_index: int, language
 def transcribe_with_diarization(
     audio_file: BytesIO,
     audio_ext: str,
-    diarization_segments: List[Dict[str, Any]],
+    diarization_segments: list[dict[str, Any]],
     language: str = "uz",
     merge_speakers: bool = True,
-    max_workers: int = 4,
-) -> List[Dict[str, Any]]:
+    max_workers: int = 16,
+) -> list[dict[str, Any]]:
     """
     Transcribe audio using AISHA API, mapping to diarization speakers.
 
@@ -78,7 +96,7 @@ def transcribe_with_diarization(
         diarization_segments: PyAnnote diarization output with speaker/start/end
         language: Language code for AISHA (uz, ru, etc.)
         merge_speakers: Whether to merge consecutive segments from same speaker
-        max_workers: Number of parallel transcription requests
+        max_workers: Maximum number of in-flight transcription requests
 
     Returns:
         List of dicts with speaker, start, end, and text
@@ -87,15 +105,15 @@ def transcribe_with_diarization(
         logger.warning("No diarization segments provided")
         return []
 
-    # Load full audio
-    audio_file.seek(0)
-    full_audio = AudioSegment.from_file(audio_file, format=audio_ext)
-    logger.debug(f"Loaded audio: {len(full_audio)}ms, {audio_ext} format")
+    # Decode full audio once to raw PCM, segments are zero-copy views into it
+    pcm = memoryview(decode_to_pcm(audio_file, audio_ext))
+    duration_ms = len(pcm) * 1000 // (SAMPLE_RATE * SAMPLE_WIDTH)
+    logger.debug(f"Loaded audio: {duration_ms}ms, {audio_ext} format")
 
     # Optionally merge consecutive segments from same speaker before transcribing
     # This reduces API calls and gives better context for transcription
     if merge_speakers:
-        segments_to_process = _merge_consecutive_speakers(diarization_segments)
+        segments_to_process = merge_consecutive_speakers(diarization_segments)
         logger.debug(f"Merged {len(diarization_segments)} segments into {len(segments_to_process)}")
     else:
         segments_to_process = diarization_segments
@@ -103,62 +121,51 @@ def transcribe_with_diarization(
     # Extract audio segments
     audio_segments = []
     for i, seg in enumerate(segments_to_process):
-        start_ms = int(seg["start"] * 1000)
-        end_ms = int(seg["end"] * 1000)
-        audio_chunk = full_audio[start_ms:end_ms]
-        audio_segments.append((i, seg, audio_chunk))
-
-    # Transcribe segments in parallel
-    results = [None] * len(audio_segments)
-
-    with ThreadPoolExecutor(max_workers=max_workers) as executor:
-        future_to_idx = {
-            executor.submit(transcribe_segment, chunk, idx, language): idx
-            for idx, seg, chunk in audio_segments
-        }
-
-        for future in as_completed(future_to_idx):
-            idx = future_to_idx[future]
-            try:
-                text = future.result()
-                results[idx] = text
-            except Exception as e:
-                logger.error(f"Transcription failed for segment {idx}: {e}")
-                results[idx] = ""
+        wav_audio = pcm_to_wav([slice_pcm(pcm, seg["start"], seg["end"])])
+        audio_segments.append((i, seg, wav_audio))
+
+    # Transcribe segments concurrently on a single event loop
+    results = asyncio.run(_transcribe_segments(audio_segments, language, max_workers))
 
     # Build final result with speaker labels
     final_result = []
-    for i, (idx, seg, chunk) in enumerate(audio_segments):
+    for (idx, seg, chunk), text in zip(audio_segments, results):
         final_result.append({
             "speaker": seg["speaker"],
             "start": seg["start"],
             "end": seg["end"],
-            "text": results[i] or "",
+            "text": text or "",
         })
 
     logger.debug(f"Transcription complete: {len(final_result)} segments")
     return final_result
 
 
-def _merge_consecutive_speakers(segments: List[Dict]) -> List[Dict]:
+async def _transcribe_segments(
+    audio_segments: list[tuple], language: str, max_workers: int
+) -> list[str]:
     """
-    Merge consecutive segments from the same speaker.
-    This reduces the number of API calls and provides better context.
+    Transcribe all segments concurrently over one pooled HTTP client.
+
+    Results are returned in the same order as ``audio_segments``;
+    failed segments yield an empty string.
     """
-    if not segments:
-        return segments
-
-    merged = []
-    current = segments[0].copy()
-
-    for segment in segments[1:]:
-        if segment["speaker"] == current["speaker"]:
-            # Same speaker - extend the segment
-            current["end"] = segment["end"]
-        else:
-            # Different speaker - save current and start new
-            merged.append(current)
-            current = segment.copy()
-
-    merged.append(current)
-    return merged
+    limits = httpx.Limits(max_connections=max_workers, max_keepalive_connections=max_workers)
+    headers = {"x-api-key": settings.AISHA_API_KEY}
+
+    async with httpx.AsyncClient(headers=headers, limits=limits, timeout=30) as client:
+        results = await asyncio.gather(
+            *(
+                transcribe_segment(client, chunk, idx, language)
+                for idx, seg, chunk in audio_segments
+            ),
+            return_exceptions=True,
+        )
+
+    texts = []
+    for idx, result in enumerate(results):
+        if isinstance(result, BaseException):
+            logger.error(f"Transcription failed for segment {idx}: {result}")
+            result = ""
+        texts.append(result)
+    return texts
@@ -1,5 +1,5 @@
 import os
-from ai.audio_utils import audio_to_text_v2, convert_mp3_to_wav
+from ai import aisha_ai
 
 
 def main():
@@ -10,8 +10,8 @@ def main():
 
     print("Converting audio to text...")
     for fragment in fragments:
-        fragment = convert_mp3_to_wav(fragment)
-        # audio = AudioSegment.from_file(fragment)
-        text_result = audio_to_text_v2(fragment)
-        print(f"So‘zlovchi-{speaker}:", text_result)
+        # Send the mp3 as is, the API decodes it itself - no WAV round-trip needed
+        with open(fragment, mode="rb") as audio:
+            text_result = aisha_ai.stt(audio, os.path.basename(fragment), has_diarization=False)
+        print(f"So‘zlovchi-{speaker}:", text_result.get("text", ""))
         speaker = 0 if speaker else 1
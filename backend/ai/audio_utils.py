@@ -1,14 +1,29 @@
 """
 Ovozly Backend - Audio Utilities
 
-Provides audio file manipulation utilities using pydub.
+Provides audio file manipulation utilities using pydub and ffmpeg.
 """
 
+import struct
+import subprocess
 from io import BytesIO
-from typing import List, Dict
+from itertools import groupby
+from operator import itemgetter
+from tempfile import NamedTemporaryFile
+from typing import BinaryIO, List, Dict, Optional, Union
 
 from loguru import logger
 from pydub import AudioSegment
+from pydub.exceptions import CouldntDecodeError
+from pydub.utils import get_prober_name
+
+
+# Raw PCM layout produced by decode_to_pcm(): mono, signed 16-bit little-endian
+SAMPLE_RATE = 16000
+SAMPLE_WIDTH = 2
+
+# Canonical 44-byte RIFF/WAVE header for uncompressed mono PCM
+_WAV_HEADER = struct.Struct("<4sI4s4sIHHIIHH4sI")
 
 
 def convert_mp3_to_wav(mp3_file: str) -> BytesIO:
@@ -22,60 +37,118 @@ def convert_mp3_to_wav(mp3_file: str) -> BytesIO:
     return wav_bytes_io
 
 
-def split_audio_into_segments(
-    audio: BytesIO, audio_ext: str, diar_data: List[Dict], do_merge: bool = True
-) -> List[BytesIO]:
+def decode_to_pcm(audio: BytesIO, audio_ext: str, sample_rate: int = SAMPLE_RATE) -> bytes:
     """
-    Split audio into segments based on diarization data.
+    Decode an audio file to raw mono PCM16 in a single ffmpeg pass.
+
+    The result can be sliced by sample offset (see slice_pcm) without
+    decoding the file again for every segment.
 
     Args:
         audio: Audio file as BytesIO
         audio_ext: Audio file extension (m4a, mp3, wav, etc.)
-        diar_data: Diarization data with speaker, start, end
-        do_merge: Whether to merge consecutive segments from same speaker
+        sample_rate: Output sample rate in Hz
 
     Returns:
-        List of audio segments as BytesIO
+        Raw PCM bytes (s16le, mono)
     """
-    merged = []
-    prev_speaker = ""
-
-    for i in diar_data:
-        if do_merge:
-            if prev_speaker == i["speaker"]:
-                merged[-1]["end"] = i["end"]
-            else:
-                merged.append(i)
-                prev_speaker = i["speaker"]
-        else:
-            merged.append(i)
-
-    logger.debug(f"Merged conversation segments: {len(merged)}")
-    logger.debug(f"Segments:\n{merged}")
-
-    # Load the audio file
-    audio.seek(0)
-    audio_segment = AudioSegment.from_file(audio, format=audio_ext)
-    segments = []
+    # Containers like m4a may need a seekable input, so go through a temp file
+    with NamedTemporaryFile(suffix=f".{audio_ext}") as tmp:
+        tmp.write(audio.getvalue())
+        tmp.flush()
+
+        command = [
+            AudioSegment.converter, "-nostdin", "-loglevel", "error",
+            "-i", tmp.name,
+            "-f", "s16le", "-acodec", "pcm_s16le", "-ac", "1", "-ar", str(sample_rate),
+            "pipe:1",
+        ]
+        try:
+            process = subprocess.run(command, capture_output=True, check=True)
+        except subprocess.CalledProcessError as e:
+            raise CouldntDecodeError(
+                f"Decoding failed. ffmpeg returned error code: {e.returncode}\n\n"
+                f"{e.stderr.decode(errors='replace')}"
+            ) from e
+
+    return process.stdout
+
+
+def probe_duration(audio: BytesIO, audio_ext: str) -> Optional[float]:
+    """
+    Read the duration of an audio file from its container with ffprobe.
 
-    # Loop through timestamps and export each segment
-    timestamps = [(i["start"], i["end"]) for i in merged]
-    for i, (start, end) in enumerate(timestamps):
-        start_ms = start * 1000
-        end_ms = end * 1000
+    Much cheaper than decode_to_pcm(), as no samples are decoded.
 
-        # Extract the audio segment
-        segment = audio_segment[start_ms:end_ms]
+    Args:
+        audio: Audio file as BytesIO
+        audio_ext: Audio file extension (m4a, mp3, wav, etc.)
 
-        # Save to BytesIO
-        output = BytesIO()
-        segment.export(output, format="wav")
-        output.seek(0)
+    Returns:
+        Duration in seconds, or None if the container doesn't report one
+    """
+    with NamedTemporaryFile(suffix=f".{audio_ext}") as tmp:
+        tmp.write(audio.getvalue())
+        tmp.flush()
+
+        command = [
+            get_prober_name(), "-v", "error",
+            "-show_entries", "format=duration",
+            "-of", "default=noprint_wrappers=1:nokey=1",
+            tmp.name,
+        ]
+        # An unreadable file is reported as unknown, the caller decodes it instead
+        process = subprocess.run(command, capture_output=True, text=True, check=False)
+
+    try:
+        return float(process.stdout.strip())
+    except ValueError:
+        logger.debug("ffprobe reported no duration for .{} audio", audio_ext)
+        return None
+
+
+def slice_pcm(
+    pcm: Union[bytes, memoryview], start: float, end: float, sample_rate: int = SAMPLE_RATE
+) -> Union[bytes, memoryview]:
+    """
+    Cut the [start, end) interval, given in seconds, out of raw PCM16 audio.
+    Pass a memoryview to get a view instead of a copy.
+    """
+    start_byte = int(start * sample_rate) * SAMPLE_WIDTH
+    end_byte = int(end * sample_rate) * SAMPLE_WIDTH
+    return pcm[start_byte:end_byte]
+
+
+def wav_header(data_size: int, sample_rate: int = SAMPLE_RATE) -> bytes:
+    """Build the WAV header for `data_size` bytes of mono PCM16 audio."""
+    return _WAV_HEADER.pack(
+        b"RIFF", 36 + data_size, b"WAVE",
+        b"fmt ", 16, 1, 1, sample_rate, sample_rate * SAMPLE_WIDTH, SAMPLE_WIDTH, SAMPLE_WIDTH * 8,
+        b"data", data_size,
+    )
+
+
+def pcm_to_wav(pcm_chunks: List[Union[bytes, memoryview]], sample_rate: int = SAMPLE_RATE) -> bytes:
+    """
+    Assemble raw mono PCM16 chunks into one WAV file without re-encoding them.
+
+    The header and all chunks are joined in a single copy, so the result can
+    be handed to the HTTP client as the upload body as is.
+    """
+    data_size = sum(len(chunk) for chunk in pcm_chunks)
+    return b"".join([wav_header(data_size, sample_rate), *pcm_chunks])
 
-        # Append to segments
-        segments.append(output)
 
-    return segments
+def merge_consecutive_speakers(segments: List[Dict]) -> List[Dict]:
+    """
+    Merge consecutive segments from the same speaker.
+    This reduces the number of API calls and provides better context.
+    """
+    merged = []
+    for _, group in groupby(segments, key=itemgetter("speaker")):
+        group = list(group)
+        merged.append({**group[0], "end": group[-1]["end"]})
+    return merged
 
 
 def merge_diarization_and_text(diarization_data: List[Dict], text_data: List[str]) -> List[Dict]:
@@ -88,7 +161,7 @@ def merge_diarization_and_text(diarization_data: List[Dict], text_data: List[str
     return merged
 
 
-def get_audio_duration(audio: BytesIO, audio_format: str) -> float:
+def get_audio_duration(audio: BinaryIO, audio_format: str) -> float:
     """Get the duration of an audio file in seconds."""
     audio.seek(0)
     audio_segment = AudioSegment.from_file(audio, format=audio_format)
@@ -0,0 +1,63 @@
+"""
+Ovozly Backend - AI Result Cache
+
+Process-local LRU cache for results of deterministic AI calls
+(speech-to-text, analysis), keyed by a content hash of their input.
+"""
+
+import hashlib
+from typing import Any, Optional, Union
+
+import orjson
+from cachetools import LRUCache
+
+
+# Memory budget per process; entries range from short segment texts to whole
+# analyses and transcripts, so the cache is bounded by size rather than count
+MAX_BYTES = 32 * 1024 * 1024
+
+# Rough per-entry overhead of the key and bookkeeping
+_ENTRY_OVERHEAD = 128
+
+
+def _sizeof(value: Any) -> int:
+    """Approximate the memory held by a cached result by its serialized size."""
+    if isinstance(value, str):
+        return _ENTRY_OVERHEAD + len(value)
+    # Whisper results hold SDK objects, those are measured by their repr
+    return _ENTRY_OVERHEAD + len(orjson.dumps(value, default=str))
+
+
+_results = LRUCache(maxsize=MAX_BYTES, getsizeof=_sizeof)
+
+
+def make_key(namespace: str, *parts: Union[str, bytes]) -> bytes:
+    """
+    Build a cache key from a namespace and the inputs of a call.
+
+    Args:
+        namespace: Name of the producing service (e.g. "aisha")
+        parts: Call inputs; strings are UTF-8 encoded, bytes are hashed as is
+
+    Returns:
+        16-byte BLAKE2b digest
+    """
+    digest = hashlib.blake2b(namespace.encode(), digest_size=16)
+    for part in parts:
+        digest.update(b"\x00")
+        digest.update(part.encode() if isinstance(part, str) else part)
+    return digest.digest()
+
+
+def get(key: bytes) -> Optional[Any]:
+    """Return the cached result for `key`, or None on a miss."""
+    return _results.get(key)
+
+
+def put(key: bytes, value: Any) -> None:
+    """Store a result. Only cache successful results, failures should be retried."""
+    try:
+        _results[key] = value
+    except ValueError:
+        # Larger than the whole budget, not worth evicting everything else for
+        pass
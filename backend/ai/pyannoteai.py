@@ -5,18 +5,16 @@ Client for the PyAnnote AI speaker diarization API service.
 Handles job submission, status polling, and result retrieval.
 """
 
-import requests
 from enum import StrEnum, auto
 from typing import Optional, Tuple
 
+import httpx
+import orjson
 from loguru import logger
 
 from core.config import settings
 
 
-session = requests.Session()
-
-
 class PyAnnoteAI_Status(StrEnum):
     """Status codes returned by PyAnnote AI API."""
     PENDING = auto()
@@ -31,6 +29,10 @@ class PyAnnoteAI_Status(StrEnum):
     UNKNOWN = auto()
 
 
+# API status string -> status, unexpected values map to UNKNOWN instead of raising
+_STATUS_BY_NAME = {status.value: status for status in PyAnnoteAI_Status}
+
+
 class PyAnnoteAI:
     """
     Client for PyAnnote AI speaker diarization service.
@@ -42,6 +44,7 @@ class PyAnnoteAI:
         BASE_URL: API base endpoint
         SUBMIT: Diarization submission endpoint
         GET_JOB: Job status retrieval endpoint
+        IN_PROGRESS: Job statuses that are still worth polling
     """
 
     BASE_URL = "https://api.pyannote.ai/v1/"
@@ -49,14 +52,24 @@ class PyAnnoteAI:
     GET_JOB = f"{BASE_URL}jobs/{{job_id}}"
     LIST_JOBS = f"{BASE_URL}/jobs"
 
+    # Statuses worth polling again; anything else is final
+    IN_PROGRESS = (
+        PyAnnoteAI_Status.CREATED,
+        PyAnnoteAI_Status.PENDING,
+        PyAnnoteAI_Status.RUNNING,
+        PyAnnoteAI_Status.TOO_MANY_REQUESTS,
+    )
+
     def __init__(self, auth_token: str) -> None:
         """Initialize client with API authentication token."""
-        self.session = requests.Session()
-        self.session.headers.update(
-            {
+        # One pooled keep-alive client, shared by submit and every check_job poll
+        self.session = httpx.Client(
+            headers={
                 "Authorization": f"Bearer {auth_token}",
                 "Content-Type": "application/json",
-            }
+            },
+            limits=httpx.Limits(max_keepalive_connections=16),
+            timeout=30,
         )
 
     def submit(self, audio_url: str) -> Tuple[PyAnnoteAI_Status, Optional[str]]:
@@ -71,7 +84,7 @@ class PyAnnoteAI:
         """
         data = {"url": audio_url, "numSpeakers": 2}
         resp = self.session.post(self.SUBMIT, json=data)
-        logger.debug(f"pyannoteAI.submit | {resp.status_code} | {resp.content=}")
+        logger.debug("pyannoteAI.submit | {} | resp.content={!r}", resp.status_code, resp.content)
 
         if resp.status_code == 400:
             return PyAnnoteAI_Status.INVALID_REQUEST, None
@@ -85,7 +98,7 @@ class PyAnnoteAI:
         data = resp.json()
         st = data.get("status", "unknown")
 
-        return PyAnnoteAI_Status(st), data.get("jobId", None)
+        return _STATUS_BY_NAME.get(st.lower(), PyAnnoteAI_Status.UNKNOWN), data.get("jobId", None)
 
     def check_job(self, job_id: str) -> Tuple[PyAnnoteAI_Status, Optional[dict]]:
         """
@@ -98,7 +111,9 @@ class PyAnnoteAI:
             Tuple of (status, data) where data contains diarization results on success
         """
         resp = self.session.get(self.GET_JOB.format(job_id=job_id))
-        logger.debug(f"pyannoteAI.check_job | {resp.status_code} | {resp.content=}")
+        logger.debug(
+            "pyannoteAI.check_job | {} | resp.content={!r}", resp.status_code, resp.content
+        )
 
         if resp.status_code == 400:
             return PyAnnoteAI_Status.INVALID_REQUEST, None
@@ -109,10 +124,11 @@ class PyAnnoteAI:
         if resp.status_code == 429:
             return PyAnnoteAI_Status.TOO_MANY_REQUESTS, None
 
-        data = resp.json()
+        # Diarization payloads of long calls are large, parse them once with orjson
+        data = orjson.loads(resp.content)
         st = data.get("status", "unknown")
 
-        return PyAnnoteAI_Status(st.lower()), resp.json()
+        return _STATUS_BY_NAME.get(st.lower(), PyAnnoteAI_Status.UNKNOWN), data
 
 
 pyannoteai = PyAnnoteAI(settings.PYANNOTEAI_TOKEN)
@@ -5,16 +5,45 @@ Provides fast cloud-based speech-to-text transcription using OpenAI's Whisper AP
 Supports Uzbek and Russian languages with word-level timestamps for diarization mapping.
 """
 
+import asyncio
+from bisect import bisect_left, bisect_right
 from io import BytesIO
-from typing import Optional, List, Dict, Any
+from operator import itemgetter
+from typing import Any, Optional
 
-from openai import OpenAI
-from pydub import AudioSegment
 from loguru import logger
-
+from openai import AsyncOpenAI
+from pydub import AudioSegment
+from pydub.silence import detect_silence
+
+from ai import cache
+from ai.audio_utils import (
+    SAMPLE_RATE,
+    SAMPLE_WIDTH,
+    decode_to_pcm,
+    pcm_to_wav,
+    probe_duration,
+    slice_pcm,
+)
+from ai.openai import client
 from core.config import settings
 
 
+# Formats the Whisper API decodes itself; anything else is converted to WAV first
+SUPPORTED_FORMATS = frozenset(
+    {"flac", "m4a", "mp3", "mp4", "mpeg", "mpga", "oga", "ogg", "wav", "webm"}
+)
+# Uncompressed input is still downmixed to 16 kHz mono (what Whisper
+# resamples to) to shrink the upload
+DOWNMIX_FORMATS = frozenset({"wav"})
+PASSTHROUGH_FORMATS = SUPPORTED_FORMATS - DOWNMIX_FORMATS
+
+# Longer recordings are split into chunks of at most this many seconds
+CHUNK_DURATION = 600.0
+# Chunk cuts are placed in a silence within the last seconds before the limit
+CUT_SEARCH_WINDOW = 50.0
+
+
 class WhisperSTT:
     """
     OpenAI Whisper API client for speech-to-text transcription.
@@ -24,21 +53,17 @@ class WhisperSTT:
     """
 
     def __init__(self):
-        self.client = OpenAI(api_key=settings.OPENAI_API_KEY)
+        self.client = client
         self.model = "whisper-1"
 
     def _convert_to_wav(self, audio_file: BytesIO, audio_ext: str) -> BytesIO:
         """
-        Convert any audio format to WAV for reliable Whisper API compatibility.
-        """
-        audio_file.seek(0)
-        audio = AudioSegment.from_file(audio_file, format=audio_ext)
-
-        wav_buffer = BytesIO()
-        audio.export(wav_buffer, format="wav")
-        wav_buffer.seek(0)
+        Convert audio to 16 kHz mono WAV for upload.
 
-        return wav_buffer
+        Decodes straight to 16 kHz mono PCM16 with ffmpeg, so no Python-side
+        sample arrays are built, and the WAV header is written around it.
+        """
+        return BytesIO(pcm_to_wav([decode_to_pcm(audio_file, audio_ext)]))
 
     def transcribe_with_timestamps(
         self,
@@ -46,7 +71,8 @@ class WhisperSTT:
         audio_ext: str = "wav",
         language: Optional[str] = None,
         prompt: Optional[str] = None,
-    ) -> Dict[str, Any]:
+        pcm: Optional[bytes] = None,
+    ) -> dict[str, Any]:
         """
         Transcribe full audio with word-level timestamps.
 
@@ -56,24 +82,30 @@ class WhisperSTT:
             language: ISO-639-1 language code, or None for auto-detection.
                      Note: Whisper doesn't support Uzbek - use None with prompt instead.
             prompt: Optional prompt to guide transcription (helps with Uzbek)
+            pcm: The audio already decoded by decode_to_pcm(), reused if it needs converting
 
         Returns:
             Dict with 'text' (full transcript) and 'segments' (with timestamps)
         """
-        # Convert to WAV for reliable compatibility with Whisper API
-        if audio_ext.lower() != "wav":
-            logger.debug(f"Converting {audio_ext} to WAV for Whisper API")
-            wav_audio = self._convert_to_wav(audio_file, audio_ext)
-        else:
+        # Send compressed supported formats as-is; convert the rest to 16 kHz mono WAV
+        if audio_ext.lower() in PASSTHROUGH_FORMATS:
             audio_file.seek(0)
-            wav_audio = audio_file
+            upload = audio_file
+            upload_ext = audio_ext.lower()
+        else:
+            logger.debug(f"Converting {audio_ext} to 16 kHz mono WAV for Whisper API")
+            if pcm is None:
+                upload = self._convert_to_wav(audio_file, audio_ext)
+            else:
+                upload = BytesIO(pcm_to_wav([pcm]))
+            upload_ext = "wav"
 
         # Create file-like object with name attribute for OpenAI SDK
-        wav_audio.name = "audio.wav"
+        upload.name = f"audio.{upload_ext}"
 
         kwargs = {
             "model": self.model,
-            "file": wav_audio,
+            "file": upload,
             "response_format": "verbose_json",
             "timestamp_granularities": ["segment", "word"],
         }
@@ -101,6 +133,88 @@ class WhisperSTT:
             logger.error(f"Whisper API error: {e}")
             raise
 
+    def transcribe_chunked(
+        self,
+        pcm: bytes,
+        language: Optional[str] = None,
+        prompt: Optional[str] = None,
+        chunk_duration: float = CHUNK_DURATION,
+        max_concurrency: int = 4,
+    ) -> dict[str, Any]:
+        """
+        Transcribe long audio as concurrent requests over silence-aligned chunks.
+
+        Args:
+            pcm: Audio as raw mono PCM16, see decode_to_pcm()
+            language: ISO-639-1 language code, or None for auto-detection
+            prompt: Optional prompt to guide transcription, sent with every chunk
+            chunk_duration: Maximum chunk length in seconds
+            max_concurrency: Maximum number of in-flight requests
+
+        Returns:
+            Same structure as transcribe_with_timestamps(), with chunk
+            timestamps shifted onto the timeline of the whole recording
+        """
+        duration = len(pcm) / (SAMPLE_RATE * SAMPLE_WIDTH)
+        cuts = _find_cut_points(pcm, chunk_duration)
+        bounds = list(zip([0.0, *cuts], [*cuts, duration]))
+
+        view = memoryview(pcm)
+        chunks = [pcm_to_wav([slice_pcm(view, start, end)]) for start, end in bounds]
+        logger.debug(f"Sending {len(chunks)} chunks of {duration:.0f}s audio to Whisper API")
+
+        responses = asyncio.run(self._transcribe_chunks(chunks, language, prompt, max_concurrency))
+
+        text_parts, segments, words = [], [], []
+        for (offset, _), response in zip(bounds, responses):
+            text_parts.append(response.text.strip())
+            segments.extend(
+                {"start": seg.start + offset, "end": seg.end + offset, "text": seg.text}
+                for seg in getattr(response, "segments", None) or []
+            )
+            words.extend(
+                {"start": word.start + offset, "end": word.end + offset, "word": word.word}
+                for word in getattr(response, "words", None) or []
+            )
+
+        return {
+            "text": " ".join(part for part in text_parts if part),
+            "segments": segments,
+            "words": words,
+            "language": getattr(responses[0], "language", language),
+        }
+
+    async def _transcribe_chunks(
+        self,
+        chunks: list[bytes],
+        language: Optional[str],
+        prompt: Optional[str],
+        max_concurrency: int,
+    ) -> list:
+        """Send WAV chunks to the Whisper API concurrently, results in chunk order."""
+        semaphore = asyncio.Semaphore(max_concurrency)
+
+        kwargs = {
+            "model": self.model,
+            "response_format": "verbose_json",
+            "timestamp_granularities": ["segment", "word"],
+        }
+        if language:
+            kwargs["language"] = language
+        if prompt:
+            kwargs["prompt"] = prompt
+
+        async def transcribe(async_client: AsyncOpenAI, index: int, wav_audio: bytes):
+            async with semaphore:
+                return await async_client.audio.transcriptions.create(
+                    file=(f"chunk_{index}.wav", wav_audio), **kwargs
+                )
+
+        async with AsyncOpenAI(api_key=settings.OPENAI_API_KEY) as async_client:
+            return await asyncio.gather(
+                *(transcribe(async_client, i, wav_audio) for i, wav_audio in enumerate(chunks))
+            )
+
     def transcribe_simple(
         self,
         audio_file: BytesIO,
@@ -133,16 +247,22 @@ def transcribe_full_audio(
     audio_file: BytesIO,
     audio_ext: str = "wav",
     language: Optional[str] = None,
-) -> Dict[str, Any]:
+    bypass_cache: bool = False,
+) -> dict[str, Any]:
     """
     Transcribe full audio file with timestamps.
 
+    Recordings longer than CHUNK_DURATION are split at silences and the
+    chunks are transcribed concurrently, see WhisperSTT.transcribe_chunked().
+    Results are cached by audio content, language and prompt.
+
     Args:
         audio_file: Full audio as BytesIO
         audio_ext: File extension (wav, mp3, ogg, m4a, etc.)
         language: Optional language code. Note: Whisper doesn't support Uzbek ('uz').
                  For Uzbek audio, leave as None and use prompt to guide transcription.
                  Supported: 'ru' (Russian), 'en' (English), etc.
+        bypass_cache: Always call the API, e.g. to refresh a cached transcript
 
     Returns:
         Dict with transcript and timestamp data
@@ -155,18 +275,74 @@ def transcribe_full_audio(
         "Kredit, ariza, telefon, xizmat, operator."
     )
 
-    return whisper_stt.transcribe_with_timestamps(
-        audio_file=audio_file,
-        audio_ext=audio_ext,
-        language=language,  # None = auto-detect
-        prompt=prompt,
+    key = cache.make_key(
+        "whisper", whisper_stt.model, language or "", prompt, audio_file.getvalue()
     )
+    if not bypass_cache:
+        cached = cache.get(key)
+        if cached is not None:
+            logger.debug("Whisper transcription served from cache")
+            return cached
+
+    # Only recordings that need chunking are decoded here, short ones are
+    # uploaded as they are (or converted once by transcribe_with_timestamps)
+    duration = probe_duration(audio_file, audio_ext)
+    pcm = None
+    if duration is None or duration > CHUNK_DURATION:
+        pcm = decode_to_pcm(audio_file, audio_ext)
+
+    if pcm is not None and len(pcm) > CHUNK_DURATION * SAMPLE_RATE * SAMPLE_WIDTH:
+        result = whisper_stt.transcribe_chunked(pcm, language=language, prompt=prompt)
+    else:
+        result = whisper_stt.transcribe_with_timestamps(
+            audio_file=audio_file,
+            audio_ext=audio_ext,
+            language=language,  # None = auto-detect
+            prompt=prompt,
+            pcm=pcm,
+        )
+
+    cache.put(key, result)
+    return result
+
+
+def _find_cut_points(pcm: bytes, chunk_duration: float) -> list[float]:
+    """
+    Pick chunk boundaries (in seconds) so that no chunk exceeds `chunk_duration`.
+
+    Each cut goes in the middle of the last silence within the final
+    CUT_SEARCH_WINDOW seconds before the limit, or at the limit itself when
+    there is no silence there.
+    """
+    duration = len(pcm) / (SAMPLE_RATE * SAMPLE_WIDTH)
+    cuts = []
+    start = 0.0
+
+    while duration - start > chunk_duration:
+        limit = start + chunk_duration
+        window_start = limit - CUT_SEARCH_WINDOW
+        window = AudioSegment(
+            data=slice_pcm(pcm, window_start, limit),
+            sample_width=SAMPLE_WIDTH,
+            frame_rate=SAMPLE_RATE,
+            channels=1,
+        )
+
+        silences = detect_silence(window, min_silence_len=500, silence_thresh=window.dBFS - 16)
+        if silences:
+            silence_start, silence_end = silences[-1]
+            start = window_start + (silence_start + silence_end) / 2000
+        else:
+            start = limit
+        cuts.append(start)
+
+    return cuts
 
 
 def map_transcript_to_diarization(
-    whisper_result: Dict[str, Any],
-    diarization_data: List[Dict[str, Any]],
-) -> List[Dict[str, Any]]:
+    whisper_result: dict[str, Any],
+    diarization_data: list[dict[str, Any]],
+) -> list[dict[str, Any]]:
     """
     Map Whisper transcript segments to PyAnnote diarization speakers.
 
@@ -197,53 +373,77 @@ def map_transcript_to_diarization(
         logger.warning("No timestamp data from Whisper, using fallback distribution")
         return _fallback_distribution(whisper_result.get("text", ""), diarization_data)
 
-    # Build result by assigning text to diarization segments
+    words = _normalize_words(whisper_segments)
+    mids = [mid for mid, _ in words]
+
+    # Build result by assigning text to diarization segments, merging
+    # consecutive segments from the same speaker in the same pass
     result = []
+    text_parts = []
 
     for diar_segment in diarization_data:
         diar_start = diar_segment["start"]
         diar_end = diar_segment["end"]
         speaker = diar_segment["speaker"]
 
-        # Collect words/segments that fall within this diarization window
-        segment_text_parts = []
-
-        for ws in whisper_segments:
-            # Handle both dict and Pydantic object (TranscriptionWord/TranscriptionSegment)
-            if hasattr(ws, "start"):
-                ws_start = ws.start
-                ws_end = getattr(ws, "end", ws_start)
-                word_text = getattr(ws, "word", None) or getattr(ws, "text", "")
-            else:
-                ws_start = ws.get("start", 0)
-                ws_end = ws.get("end", ws_start)
-                word_text = ws.get("word") or ws.get("text", "")
-
-            # Check if this word/segment overlaps with diarization segment
-            # Using midpoint for better accuracy
-            ws_mid = (ws_start + ws_end) / 2
+        if result and result[-1]["speaker"] == speaker:
+            result[-1]["end"] = diar_end
+        else:
+            if result:
+                result[-1]["text"] = " ".join(text_parts)
+                text_parts = []
+            result.append({
+                "speaker": speaker,
+                "start": diar_start,
+                "end": diar_end,
+                "text": "",
+            })
+
+        # Words whose midpoint lies within [diar_start, diar_end], found by binary search
+        lo = bisect_left(mids, diar_start)
+        hi = bisect_right(mids, diar_end, lo)
+        text_parts.extend(word_text for _, word_text in words[lo:hi])
+
+    if result:
+        result[-1]["text"] = " ".join(text_parts)
 
-            if diar_start <= ws_mid <= diar_end:
-                if word_text:
-                    segment_text_parts.append(word_text.strip())
+    return result
 
-        # Combine text for this speaker segment
-        segment_text = " ".join(segment_text_parts)
 
-        result.append({
-            "speaker": speaker,
-            "start": diar_start,
-            "end": diar_end,
-            "text": segment_text,
-        })
+def _normalize_words(whisper_segments: list) -> list[tuple[float, str]]:
+    """
+    Reduce Whisper words/segments to (midpoint, stripped text) tuples sorted by midpoint.
 
-    # Merge consecutive segments from same speaker
-    merged = _merge_consecutive_speakers(result)
+    The entry type is checked once for the whole list, since Whisper output is
+    either all Pydantic objects (TranscriptionWord/TranscriptionSegment) or all
+    dicts. Entries without text are dropped.
+    """
+    if hasattr(whisper_segments[0], "start"):
+        raw = (
+            (
+                ws.start,
+                getattr(ws, "end", ws.start),
+                getattr(ws, "word", None) or getattr(ws, "text", ""),
+            )
+            for ws in whisper_segments
+        )
+    else:
+        raw = (
+            (
+                ws.get("start", 0),
+                ws.get("end", ws.get("start", 0)),
+                ws.get("word") or ws.get("text", ""),
+            )
+            for ws in whisper_segments
+        )
 
-    return merged
+    # Using midpoint for better accuracy
+    words = [((start + end) / 2, text.strip()) for start, end, text in raw if text]
+    words.sort(key=itemgetter(0))
+    return words
 
 
-def _fallback_distribution(full_text: str, diarization_data: List[Dict]) -> List[Dict]:
+def _fallback_distribution(full_text: str, diarization_data: list[dict]) -> list[dict]:
     """
     Fallback: Distribute text proportionally across diarization segments.
     Used when Whisper doesn't return timestamp data.
@@ -261,14 +461,20 @@ def _fallback_distribution(full_text: str, diarization_data: List[Dict]) -> List
 
     result = []
     word_index = 0
+    last_index = len(diarization_data) - 1
 
-    for diar in diarization_data:
+    for i, diar in enumerate(diarization_data):
         segment_duration = diar["end"] - diar["start"]
         segment_proportion = segment_duration / total_duration
         words_for_segment = max(1, int(total_words * segment_proportion))
 
-        segment_words = words[word_index:word_index + words_for_segment]
-        word_index += words_for_segment
+        # Add any remaining words to last segment, so each text is joined only once
+        end_index = word_index + words_for_segment
+        if i == last_index:
+            end_index = max(end_index, total_words)
+
+        segment_words = words[word_index:end_index]
+        word_index = end_index
 
         result.append({
             "speaker": diar["speaker"],
@@ -277,38 +483,9 @@ def _fallback_distribution(full_text: str, diarization_data: List[Dict]) -> List
             "text": " ".join(segment_words),
         })
 
-    # Add any remaining words to last segment
-    if word_index < total_words and result:
-        result[-1]["text"] += " " + " ".join(words[word_index:])
-
     return result
 
 
-def _merge_consecutive_speakers(segments: List[Dict]) -> List[Dict]:
-    """
-    Merge consecutive segments from the same speaker.
-    """
-    if not segments:
-        return segments
-
-    merged = []
-    current = segments[0].copy()
-
-    for segment in segments[1:]:
-        if segment["speaker"] == current["speaker"]:
-            # Same speaker - merge
-            current["end"] = segment["end"]
-            if segment["text"]:
-                current["text"] = (current["text"] + " " + segment["text"]).strip()
-        else:
-            # Different speaker - save current and start new
-            merged.append(current)
-            current = segment.copy()
-
-    merged.append(current)
-    return merged
-
-
 # Legacy function for backward compatibility
 def transcribe_audio_whisper(audio_file: BytesIO, language: Optional[str] = None) -> str:
     """
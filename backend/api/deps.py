@@ -5,15 +5,20 @@ Provides FastAPI dependency injection functions for database sessions,
 authentication, and authorization.
 """
 
+import hashlib
+import time
 from contextlib import contextmanager
 from typing import Optional
 
+from cachetools import TLRUCache
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import make_transient_to_detached
 
 from db.models.user import User
-from db.session import SessionLocal
+from db.session import AsyncSessionLocal, SessionLocal
 from utils.jwt import JWT
 
 
@@ -21,6 +26,15 @@ reusable_oauth = OAuth2PasswordBearer(
     tokenUrl="users/authorize-swagger", scheme_name="JWT", auto_error=False
 )
 
+# Seconds a verified token keeps resolving to its user without decoding or a DB lookup
+AUTH_CACHE_TTL = 10
+
+# Token hash -> (detached User, token exp); entries never outlive the token itself
+_auth_cache = TLRUCache(
+    maxsize=10000,
+    ttu=lambda _key, value, now: now + min(AUTH_CACHE_TTL, value[1] - time.time()),
+)
+
 
 def get_db():
     db = SessionLocal()
@@ -39,6 +53,11 @@ def get_db_x():
         db.close()
 
 
+async def get_async_db():
+    async with AsyncSessionLocal() as db:
+        yield db
+
+
 class InvalidTokenException(HTTPException):
     def __init__(self):
         super().__init__(
@@ -65,41 +84,68 @@ class NotAdminException(HTTPException):
         )
 
 
+def _token_key(token: str) -> str:
+    # Raw tokens are not kept in memory, only their hash
+    return hashlib.sha256(token.encode()).hexdigest()[:32]
+
+
 async def authenticate_user(
-    token: Optional[str], db: Session, required: bool = True
+    token: Optional[str], db: AsyncSession, required: bool = True
 ) -> Optional[User]:
     if not token:
         if required:
             raise NotAuthenticatedException
         return None
 
+    key = _token_key(token)
+    cached = _auth_cache.get(key)
+    if cached is not None:
+        return await db.merge(cached[0], load=False)
+
     token_data = JWT.decode_access_token(token)
-    user = User.get(db, email=token_data.sub)
+    result = await db.execute(select(User).where(User.email == token_data.sub))
+    user = result.scalars().first()
 
     if user is None:
         raise InvalidTokenException
 
+    # Cache a detached copy, so the request session keeps its own instance
+    snapshot = User(
+        **{column.key: getattr(user, column.key) for column in User.__mapper__.column_attrs}
+    )
+    make_transient_to_detached(snapshot)
+    _auth_cache[key] = (snapshot, token_data.exp)
+
     return user
 
 
 async def get_user(
-    token: Optional[str] = Depends(reusable_oauth), db: Session = Depends(get_db)
+    token: Optional[str] = Depends(reusable_oauth), db: AsyncSession = Depends(get_async_db)
 ) -> User:
     return await authenticate_user(token, db)
 
 
 async def get_user_optional(
-    token: Optional[str] = Depends(reusable_oauth), db: Session = Depends(get_db)
+    token: Optional[str] = Depends(reusable_oauth), db: AsyncSession = Depends(get_async_db)
 ) -> Optional[User]:
     return await authenticate_user(token, db, required=False)
 
 
 async def admin_only(
-    token: Optional[str] = Depends(reusable_oauth), db: Session = Depends(get_db)
+    token: Optional[str] = Depends(reusable_oauth), db: AsyncSession = Depends(get_async_db)
 ) -> bool:
-    user = await authenticate_user(token, db)
+    if not token:
+        raise NotAuthenticatedException
+
+    # The role claim only skips the lookup when the recently verified user agrees with
+    # it; otherwise the current role is read, so promotions and demotions take effect
+    # within AUTH_CACHE_TTL rather than when the long-lived token expires
+    cached = _auth_cache.get(_token_key(token))
+    if cached is not None and cached[0].role == "admin":
+        if JWT.decode_access_token(token).role == "admin":
+            return True
 
-    if user.role != "admin":
+    if (await authenticate_user(token, db)).role != "admin":
         raise NotAdminException
 
     return True
@@ -5,36 +5,96 @@ This module provides REST API endpoints for audio processing and speech analysis
 Supports both async (Celery-based) and sync (AISHA API) processing modes.
 """
 
+import asyncio
+import hashlib
 import secrets
 import uuid
-from io import BytesIO
+from collections.abc import AsyncIterator
 from typing import List, Optional
 
-from fastapi import APIRouter, Depends, File, HTTPException, Query, UploadFile
+from cachetools import TTLCache
+from fastapi import (
+    APIRouter,
+    BackgroundTasks,
+    Depends,
+    File,
+    HTTPException,
+    Query,
+    Request,
+    Response,
+    UploadFile,
+)
+from fastapi.responses import StreamingResponse
+from google.api_core.exceptions import NotFound
+from kombu.exceptions import ContentDisallowed
 from loguru import logger
-from sqlalchemy import desc, asc
-from sqlalchemy.orm import Session, joinedload
+from pydantic import TypeAdapter
+from sqlalchemy import asc, desc, exists, func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import joinedload, raiseload, selectinload
 
 from ai import aisha_ai
 from ai.audio_utils import get_audio_duration
-from api.deps import get_db, get_user
+from api.deps import get_async_db, get_user
 from api.schemas.call import Call as CallSchema, CallWithAnalysis, CallWithAnalysisSummary
-from api.schemas.speech_analysis import SpeechAnalysis as SpeechAnalysisSchema
+from api.schemas.speech_analysis import (
+    SpeechAnalysis as SpeechAnalysisSchema,
+    SpeechAnalysisSummary,
+)
 from core.celery_app import celery
 from core.tasks import convert_audio_to_text
 from db import Call, SpeechAnalysis
 from db.models.user import User
+from db.session import AsyncSessionLocal
 from utils.bucket import upload_bytesio_and_make_public, delete_blob_from_url
 from utils.text import get_extension
 
 
 router = APIRouter(prefix="/stt", tags=["Speech-to-Text"])
 
+# Columns read by the call list, taken from its response schemas
+_CALL_FIELDS = [name for name in CallWithAnalysisSummary.model_fields if name != "speech_analysis"]
+_SUMMARY_FIELDS = list(SpeechAnalysisSummary.model_fields)
 
-def generate_unique_filename(db: Session, original_filename: str) -> str:
+# Serializer for the call list, built once; rows are already model instances,
+# so the response doesn't need another validation pass
+_call_list_adapter = TypeAdapter(List[CallWithAnalysisSummary])
+
+# Rows fetched per server-side cursor round trip when streaming the call list
+_CALL_LIST_BATCH = 500
+
+# Upload formats accepted by the synchronous AISHA endpoint
+_AISHA_CONTENT_TYPES = frozenset({"audio/mpeg", "audio/wav", "audio/ogg"})
+
+# Celery states after which a task's status never changes
+_FINAL_TASK_STATES = frozenset({"SUCCESS", "FAILURE", "FAIL", "REVOKED"})
+
+# Call list filter and sort whitelists
+_VALID_STATUSES = frozenset({"SUCCESS", "RUNNING", "FAILED", "PENDING", "FAIL"})
+_FAILED_STATUSES = ("FAILED", "FAIL")
+_SORT_COLUMNS = {
+    "created_at": Call.created_at,
+    "call_duration": Call.call_duration,
+    "file_name": Call.file_name,
+    "date": Call.created_at,
+    "duration": Call.call_duration,
+}
+
+# Random suffixes tried per lookup when an uploaded filename is already taken
+_FILENAME_CANDIDATES = 4
+
+# Dashboard summaries per scope ("admin" or agent ID), refreshed at most every 30 seconds
+_analytics_cache = TTLCache(maxsize=1024, ttl=30)
+
+
+async def generate_unique_filename(db: AsyncSession, original_filename: str) -> str:
     """
     Generate a unique filename by adding random suffix if filename already exists.
 
+    The common no-clash case is settled by a single EXISTS probe. On a clash,
+    a batch of random candidates is checked with one indexed IN lookup, so
+    the query never reads more rows than there are candidates.
+
     Args:
         db: Database session
         original_filename: Original uploaded filename
@@ -42,40 +102,35 @@ def generate_unique_filename(db: Session, original_filename: str) -> str:
     Returns:
         Unique filename (original or with random suffix)
     """
-    # Check if filename already exists
-    existing = db.query(Call).filter(Call.file_name == original_filename).first()
-
-    if not existing:
+    if not await db.scalar(select(exists().where(Call.file_name == original_filename))):
         return original_filename
 
-    # Split filename into name and extension
-    if "." in original_filename:
-        name_parts = original_filename.rsplit(".", 1)
-        base_name = name_parts[0]
-        extension = name_parts[1]
-    else:
-        base_name = original_filename
-        extension = ""
+    # Split filename into name and extension, rpartition leaves the base empty without a dot
+    base_name, dot, extension = original_filename.rpartition(".")
+    if not dot:
+        base_name, extension = extension, ""
 
     # Generate unique filename with random suffix
     while True:
-        random_suffix = secrets.token_hex(3)  # 6 characters
-        if extension:
-            new_filename = f"{base_name}_{random_suffix}.{extension}"
-        else:
-            new_filename = f"{base_name}_{random_suffix}"
+        candidates = []
+        for _ in range(_FILENAME_CANDIDATES):
+            random_suffix = secrets.token_hex(3)  # 6 characters
+            if extension:
+                candidates.append(f"{base_name}_{random_suffix}.{extension}")
+            else:
+                candidates.append(f"{base_name}_{random_suffix}")
 
-        # Check if this new filename exists
-        existing = db.query(Call).filter(Call.file_name == new_filename).first()
-        if not existing:
-            return new_filename
+        taken = set(await db.scalars(select(Call.file_name).where(Call.file_name.in_(candidates))))
+        for new_filename in candidates:
+            if new_filename not in taken:
+                return new_filename
 
 
 @router.post("/submit-audio", response_model=CallSchema)
 async def upload_audio(
     file: UploadFile = File(...),
     auth_user: User = Depends(get_user),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
 ):
     """
     Upload an audio file for asynchronous processing.
@@ -89,42 +144,53 @@ async def upload_audio(
     Returns:
         Call object with task_id for status tracking
     """
-    logger.debug(f"User {auth_user.email} is uploading an audio file")
+    logger.debug("User {} is uploading an audio file", auth_user.email)
     # Validate file type
     if not file.content_type.startswith("audio/"):
         raise HTTPException(status_code=400, detail="File must be an audio file.")
 
-    # read audio
-    audio_raw = await file.read()
     audio_ext = get_extension(file.filename)
 
-    # Generate unique filename if duplicate exists
-    unique_filename = generate_unique_filename(db, file.filename)
-    blob_name = f"{uuid.uuid4()}_{unique_filename}"
+    # resolve the display filename first: it's a cheap lookup on ix_calls_file_name, and running it
+    # alongside the upload could leave the session busy while a failed upload unwinds
+    unique_filename = await generate_unique_filename(db, file.filename)
 
-    logger.debug(f"{audio_ext=} {blob_name=} {unique_filename=}")
+    # the uuid prefix keeps blob names unique; stream the spooled upload to blob
+    # storage (the worker downloads it from there)
+    blob_name = f"{uuid.uuid4()}_{file.filename}"
+    blob_url = await asyncio.to_thread(
+        upload_bytesio_and_make_public, file.file, blob_name, file.content_type
+    )
+    logger.debug(
+        "audio_ext={!r} blob_url={!r} unique_filename={!r}", audio_ext, blob_url, unique_filename
+    )
 
-    # upload audio to blob storage
-    audio = BytesIO(audio_raw)
-    blob_url = upload_bytesio_and_make_public(audio, blob_name, file.content_type)
-    logger.debug("File uploaded:", blob_url)
+    # decoding for the duration is CPU-bound, keep it off the event loop
+    call_duration = await asyncio.to_thread(get_audio_duration, file.file, audio_ext)
 
-    # save call in db
+    # save call in db, with the celery task ID chosen up front so it takes a single commit
+    task_id = str(uuid.uuid4())
     call = Call(
         file_id=blob_url,
         file_name=unique_filename,
         agent_id=auth_user.id,
         status="RUNNING",
-        call_duration=get_audio_duration(audio, audio_ext),
+        call_duration=call_duration,
+        celery_task_id=task_id,
     )
     db.add(call)
-    db.commit()
-    db.refresh(call)
+    await db.commit()
+    await db.refresh(call)
 
-    # create celery task for analysis
-    result = convert_audio_to_text.delay(audio_raw, audio_ext, call.id)
-    call.celery_task_id = result.task_id
-    db.commit()
+    # create celery task for analysis; the row is already committed, so a failed
+    # enqueue marks it failed rather than leaving it RUNNING forever
+    try:
+        convert_audio_to_text.apply_async(args=(audio_ext, call.id), task_id=task_id)
+    except Exception as e:
+        logger.error(f"Could not queue analysis for call {call.id}: {e}")
+        call.status = "FAIL"
+        await db.commit()
+        raise HTTPException(status_code=503, detail="Could not queue the audio for processing")
 
     return call
 
@@ -133,7 +199,6 @@ async def upload_audio(
 async def upload_audio_v2(
     file: UploadFile = File(...),
     auth_user: User = Depends(get_user),
-    db: Session = Depends(get_db),
 ):
     """
     Upload an audio file for synchronous processing via AISHA API.
@@ -147,28 +212,47 @@ async def upload_audio_v2(
     Returns:
         Transcription result from AISHA API
     """
-    logger.debug(f"User {auth_user.email} is uploading an audio file")
+    logger.debug("User {} is uploading an audio file", auth_user.email)
 
     content_type = file.content_type
-    logger.debug(f"File Content Type: {content_type}")  # Debugging
+    logger.debug("File Content Type: {}", content_type)
 
     # Validate file type
-    if not content_type.startswith("audio/"):
-        raise HTTPException(status_code=400, detail="File must be an audio file.")
-
-    if content_type not in ["audio/mpeg", "audio/wav", "audio/ogg"]:
-        return {"error": "Invalid file format. Please upload a .mp3, .wav, or .ogg file."}
+    if content_type not in _AISHA_CONTENT_TYPES:
+        raise HTTPException(
+            status_code=400, detail="Invalid file format. Please upload a .mp3, .wav, or .ogg file."
+        )
 
     audio = (file.filename, await file.read(), file.content_type)
-    result = aisha_ai.stt(audio, title=file.filename, has_diarization=False, language="uz")
+    result = await aisha_ai.stt_async(audio, title=file.filename, language="uz")
     return result
 
 
+def _if_none_match(request: Request) -> List[str]:
+    """ETags listed in the request's If-None-Match header."""
+    return [tag.strip() for tag in request.headers.get("if-none-match", "").split(",")]
+
+
+def _task_state(task_id: str) -> tuple:
+    """Fetch a Celery task's status and result from the result backend."""
+    result = celery.AsyncResult(task_id)
+    try:
+        status = result.status
+    except ContentDisallowed:
+        # Results stored before the switch to JSON are pickled and are never loaded
+        return None, None
+    # The analysis task re-schedules itself while diarization runs, that's still running
+    if status == "RETRY":
+        return "RUNNING", {"detail": "Waiting for diarization..."}
+    return status, result.result
+
+
 @router.get("/task-status")
-def get_task_status(
+async def get_task_status(
     task_id: str,
+    response: Response,
     auth_user: User = Depends(get_user),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
 ):
     """
     Check the status of a Celery audio processing task.
@@ -182,40 +266,63 @@ def get_task_status(
     Returns:
         Task status and result (analysis data if completed)
     """
-    logger.debug(f"User {auth_user.email} is checking task status for {task_id}")
-
-    # Get task status from Celery
-    result = celery.AsyncResult(task_id)
+    logger.debug("User {} is checking task status for {}", auth_user.email, task_id)
+
+    # Get task status from Celery, the result backend client is blocking
+    task_status, task_result = await asyncio.to_thread(_task_state, task_id)
+    if task_status is None:
+        # The call row keeps the outcome of tasks whose stored result can't be read
+        task_status = await db.scalar(
+            select(Call.status).where(Call.celery_task_id == task_id).limit(1)
+        ) or "PENDING"
+
+    # Pollers may reuse a running task's status for a second, a finished one doesn't change
+    response.headers["Cache-Control"] = (
+        "private, max-age=3600" if task_status in _FINAL_TASK_STATES else "private, max-age=1"
+    )
 
     # If task is successful, try to get data from database
-    if result.status == "SUCCESS":
-        # Find the call by celery_task_id
-        call = db.query(Call).filter(Call.celery_task_id == task_id).first()
-        if call and call.speech_analysis:
+    if task_status == "SUCCESS":
+        # Find the call and its analysis by celery_task_id
+        row = (
+            await db.execute(
+                select(Call.id, SpeechAnalysis.id)
+                .join(Call.speech_analysis)
+                .where(Call.celery_task_id == task_id)
+                .limit(1)
+            )
+        ).first()
+        if row:
+            call_id, analysis_id = row
             # Return analysis from database
             return {
-                "status": result.status,
-                "call_id": call.id,
+                "status": task_status,
+                "call_id": call_id,
                 "result": {
-                    "call_id": call.id,
+                    "call_id": call_id,
                     "status": "SUCCESS",
-                    "analysis_id": str(call.speech_analysis.id),
+                    "analysis_id": str(analysis_id),
                 }
             }
 
     # Return Celery status for pending/running/failed tasks
-    return {"status": result.status, "result": result.result}
+    return {"status": task_status, "result": task_result}
 
 
 @router.get("/call/{call_id}", response_model=CallWithAnalysis)
-def get_call(
+async def get_call(
     call_id: int,
-    db: Session = Depends(get_db),
+    request: Request,
+    response: Response,
+    db: AsyncSession = Depends(get_async_db),
     auth_user: User = Depends(get_user),
 ):
     """
     Retrieve details of a specific call recording with full analysis.
 
+    The response carries an ETag derived from the call's status and analysis,
+    so clients polling a call get a 304 without the analysis being loaded.
+
     Args:
         call_id: ID of the call record
 
@@ -226,33 +333,57 @@ def get_call(
         HTTPException 404: If call not found
         HTTPException 403: If user not authorized to view
     """
-    call = (
-        db.query(Call)
-        .options(
-            joinedload(Call.speech_analysis).joinedload(SpeechAnalysis.intents),
-            joinedload(Call.speech_analysis).joinedload(SpeechAnalysis.extracted_entities),
-            joinedload(Call.speech_analysis).joinedload(SpeechAnalysis.issues),
-            joinedload(Call.speech_analysis).joinedload(SpeechAnalysis.actions),
-            joinedload(Call.speech_analysis).joinedload(SpeechAnalysis.keypoints),
+    head = (
+        await db.execute(
+            select(Call.agent_id, Call.status, SpeechAnalysis.id)
+            .outerjoin(Call.speech_analysis)
+            .where(Call.id == call_id)
         )
-        .filter(Call.id == call_id)
-        .first()
-    )
+    ).first()
 
-    if not call:
+    if not head:
         raise HTTPException(status_code=404, detail="Call not found")
 
+    agent_id, call_status, analysis_id = head
+
     # Check authorization - only admin or owner can view
-    if auth_user.role != "admin" and call.agent_id != auth_user.id:
+    if auth_user.role != "admin" and agent_id != auth_user.id:
         raise HTTPException(status_code=403, detail="Not authorized to view this call")
 
+    # A call only changes through its status and the analysis saved alongside it
+    digest = hashlib.md5(f"{call_id}:{call_status}:{analysis_id}".encode()).hexdigest()
+    etag = f'"{digest}"'
+    cache_headers = {"ETag": etag, "Cache-Control": "private, max-age=2"}
+    if etag in _if_none_match(request):
+        return Response(status_code=304, headers=cache_headers)
+
+    call = await db.get(
+        Call,
+        call_id,
+        options=[
+            # One-to-one analysis is joined, each child collection gets its own
+            # IN query to avoid a cartesian product of all five collections
+            joinedload(Call.speech_analysis).selectinload(SpeechAnalysis.intents),
+            joinedload(Call.speech_analysis).selectinload(SpeechAnalysis.extracted_entities),
+            joinedload(Call.speech_analysis).selectinload(SpeechAnalysis.issues),
+            joinedload(Call.speech_analysis).selectinload(SpeechAnalysis.actions),
+            joinedload(Call.speech_analysis).selectinload(SpeechAnalysis.keypoints),
+            # anything the response would lazy-load beyond that is a bug, fail loudly
+            raiseload("*"),
+        ],
+    )
+
+    if not call:
+        raise HTTPException(status_code=404, detail="Call not found")
+
+    response.headers.update(cache_headers)
     return call
 
 
 @router.get("/call/{call_id}/analysis", response_model=SpeechAnalysisSchema)
-def get_call_analysis(
+async def get_call_analysis(
     call_id: int,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     auth_user: User = Depends(get_user),
 ):
     """
@@ -268,28 +399,30 @@ def get_call_analysis(
         HTTPException 404: If call or analysis not found
         HTTPException 403: If user not authorized to view
     """
-    call = db.query(Call).filter(Call.id == call_id).first()
+    agent_id = await db.scalar(select(Call.agent_id).where(Call.id == call_id))
 
-    if not call:
+    if agent_id is None:
         raise HTTPException(status_code=404, detail="Call not found")
 
     # Check authorization
-    if auth_user.role != "admin" and call.agent_id != auth_user.id:
+    if auth_user.role != "admin" and agent_id != auth_user.id:
         raise HTTPException(status_code=403, detail="Not authorized to view this call")
 
     # Get analysis with all related data
     analysis = (
-        db.query(SpeechAnalysis)
-        .options(
-            joinedload(SpeechAnalysis.intents),
-            joinedload(SpeechAnalysis.extracted_entities),
-            joinedload(SpeechAnalysis.issues),
-            joinedload(SpeechAnalysis.actions),
-            joinedload(SpeechAnalysis.keypoints),
+        await db.execute(
+            select(SpeechAnalysis)
+            .options(
+                selectinload(SpeechAnalysis.intents),
+                selectinload(SpeechAnalysis.extracted_entities),
+                selectinload(SpeechAnalysis.issues),
+                selectinload(SpeechAnalysis.actions),
+                selectinload(SpeechAnalysis.keypoints),
+                raiseload("*"),
+            )
+            .where(SpeechAnalysis.call_id == call_id)
         )
-        .filter(SpeechAnalysis.call_id == call_id)
-        .first()
-    )
+    ).scalars().first()
 
     if not analysis:
         raise HTTPException(status_code=404, detail="Analysis not found for this call")
@@ -297,22 +430,59 @@ def get_call_analysis(
     return analysis
 
 
+def _call_from_row(fields) -> CallWithAnalysisSummary:
+    """Build a call list item from a row of the call list query."""
+    analysis = None
+    if fields["analysis_id"] is not None:
+        analysis = SpeechAnalysisSummary.model_construct(
+            **{name: fields[f"analysis_{name}"] for name in _SUMMARY_FIELDS}
+        )
+    return CallWithAnalysisSummary.model_construct(
+        **{name: fields[name] for name in _CALL_FIELDS}, speech_analysis=analysis
+    )
+
+
+async def _stream_call_list(query) -> AsyncIterator[bytes]:
+    """
+    Encode the call list as a JSON array, one server-side cursor batch at a time.
+
+    Args:
+        query: Call list select, with filters, ordering and paging applied
+
+    Yields:
+        Consecutive pieces of the JSON array
+    """
+    # Dependency sessions are closed before a streamed body is sent, so use our own
+    async with AsyncSessionLocal() as db:
+        result = await db.stream(query.execution_options(yield_per=_CALL_LIST_BATCH))
+        separator = b"["
+        async for rows in result.partitions():
+            batch = _call_list_adapter.dump_json([_call_from_row(row._mapping) for row in rows])
+            yield separator + batch[1:-1]
+            separator = b","
+        yield b"[]" if separator == b"[" else b"]"
+
+
 @router.get("/calls", response_model=List[CallWithAnalysisSummary])
-def get_calls(
-    db: Session = Depends(get_db),
+async def get_calls(
     auth_user: User = Depends(get_user),
     status: Optional[str] = Query(None, description="Filter by status (SUCCESS, RUNNING, FAILED, PENDING)"),
     sentiment: Optional[str] = Query(None, description="Filter by overall sentiment (positive, neutral, negative)"),
     resolution: Optional[str] = Query(None, description="Filter by resolution status (resolved, unresolved, escalated)"),
     sort_by: Optional[str] = Query("created_at", description="Sort by field (created_at, call_duration, file_name)"),
     sort_order: Optional[str] = Query("desc", description="Sort order (asc, desc)"),
+    limit: Optional[int] = Query(
+        None, ge=1, le=1000, description="Maximum number of calls to return"
+    ),
+    offset: int = Query(0, ge=0, description="Number of calls to skip"),
 ):
     """
     List all call recordings accessible to the current user.
 
     Admin users see all calls. Agent users see only their own calls.
     Supports filtering by status, sentiment, resolution and sorting.
-    Returns calls with analysis summary for efficient list views.
+    Returns calls with analysis summary for efficient list views. The list
+    is streamed from a server-side cursor, so memory use doesn't grow with it.
 
     Args:
         status: Optional status filter
@@ -320,160 +490,153 @@ def get_calls(
         resolution: Optional resolution status filter
         sort_by: Field to sort by (created_at, call_duration, file_name)
         sort_order: Sort direction (asc, desc)
+        limit: Page size; all matching calls when omitted
+        offset: Page start
 
     Returns:
         List of Call objects with analysis summary
     """
-    logger.debug(f"User {auth_user.email} is fetching calls")
+    logger.debug("User {} is fetching calls", auth_user.email)
 
-    # Build base query with analysis summary
-    query = (
-        db.query(Call)
-        .options(joinedload(Call.speech_analysis))
-    )
+    # Select only the list columns; rows are turned into response models
+    # directly instead of hydrating Call and SpeechAnalysis ORM objects
+    query = select(
+        *(getattr(Call, name) for name in _CALL_FIELDS),
+        *(getattr(SpeechAnalysis, name).label(f"analysis_{name}") for name in _SUMMARY_FIELDS),
+    ).outerjoin(Call.speech_analysis)
 
     # Filter by user role
     if auth_user.role != "admin":
-        query = query.filter(Call.agent_id == auth_user.id)
+        query = query.where(Call.agent_id == auth_user.id)
 
     # Apply status filter if provided
     if status:
         status_upper = status.upper()
-        valid_statuses = ["SUCCESS", "RUNNING", "FAILED", "PENDING", "FAIL"]
-        if status_upper in valid_statuses:
-            if status_upper in ["FAILED", "FAIL"]:
-                query = query.filter(Call.status.in_(["FAILED", "FAIL"]))
-            else:
-                query = query.filter(Call.status == status_upper)
+        if status_upper in _FAILED_STATUSES:
+            query = query.where(Call.status.in_(_FAILED_STATUSES))
+        elif status_upper in _VALID_STATUSES:
+            query = query.where(Call.status == status_upper)
 
     # Apply sentiment filter if provided
     if sentiment:
-        query = query.join(Call.speech_analysis).filter(
-            SpeechAnalysis.overall_sentiment == sentiment.lower()
-        )
+        query = query.where(SpeechAnalysis.overall_sentiment == sentiment.lower())
 
     # Apply resolution filter if provided
     if resolution:
-        query = query.join(Call.speech_analysis, isouter=True).filter(
-            SpeechAnalysis.resolution_status == resolution.lower()
-        )
+        query = query.where(SpeechAnalysis.resolution_status == resolution.lower())
 
     # Apply sorting
-    sort_column = {
-        "created_at": Call.created_at,
-        "call_duration": Call.call_duration,
-        "file_name": Call.file_name,
-        "date": Call.created_at,
-        "duration": Call.call_duration,
-    }.get(sort_by, Call.created_at)
+    sort_column = _SORT_COLUMNS.get(sort_by, Call.created_at)
 
+    # Call ID breaks ties so pages don't overlap
     if sort_order == "asc":
-        query = query.order_by(asc(sort_column))
+        query = query.order_by(asc(sort_column), asc(Call.id))
     else:
-        query = query.order_by(desc(sort_column))
+        query = query.order_by(desc(sort_column), desc(Call.id))
 
-    return query.all()
+    return StreamingResponse(
+        _stream_call_list(query.offset(offset).limit(limit)), media_type="application/json"
+    )
 
 
 @router.get("/analytics/summary")
-def get_analytics_summary(
-    db: Session = Depends(get_db),
+async def get_analytics_summary(
+    db: AsyncSession = Depends(get_async_db),
     auth_user: User = Depends(get_user),
 ):
     """
     Get aggregated analytics summary for dashboard widgets.
 
     Returns counts and distributions for sentiments, resolutions,
-    call efficiency, and other metrics.
+    call efficiency, and other metrics. All metrics come back as a single
+    row of one query, and the summary is cached briefly per scope
+    (all calls for admins, own calls for agents).
 
     Returns:
         Analytics summary with counts and distributions
     """
-    from sqlalchemy import func
-
-    # Base query filtered by user role
-    if auth_user.role == "admin":
-        base_query = db.query(SpeechAnalysis)
-        call_query = db.query(Call)
-    else:
-        base_query = (
-            db.query(SpeechAnalysis)
-            .join(Call)
-            .filter(Call.agent_id == auth_user.id)
-        )
-        call_query = db.query(Call).filter(Call.agent_id == auth_user.id)
+    scope = "admin" if auth_user.role == "admin" else auth_user.id
+    cached = _analytics_cache.get(scope)
+    if cached is not None:
+        return cached
 
-    # Total calls
-    total_calls = call_query.count()
-    total_analyzed = base_query.count()
-
-    # Sentiment distribution
-    sentiment_counts = (
-        base_query
-        .with_entities(
+    # Filter by user role
+    call_filter = [] if auth_user.role == "admin" else [Call.agent_id == auth_user.id]
+    calls = select(Call.status, Call.call_duration).where(*call_filter).subquery()
+    analyses = (
+        select(
             SpeechAnalysis.overall_sentiment,
-            func.count(SpeechAnalysis.id)
-        )
-        .group_by(SpeechAnalysis.overall_sentiment)
-        .all()
-    )
-
-    # Resolution status distribution
-    resolution_counts = (
-        base_query
-        .with_entities(
             SpeechAnalysis.resolution_status,
-            func.count(SpeechAnalysis.id)
-        )
-        .group_by(SpeechAnalysis.resolution_status)
-        .all()
-    )
-
-    # Call efficiency distribution
-    efficiency_counts = (
-        base_query
-        .with_entities(
             SpeechAnalysis.call_efficiency,
-            func.count(SpeechAnalysis.id)
         )
-        .group_by(SpeechAnalysis.call_efficiency)
-        .all()
+        .join(Call, SpeechAnalysis.call_id == Call.id)
+        .where(*call_filter)
+        .subquery()
     )
 
-    # Call status distribution
-    status_counts = (
-        call_query
-        .with_entities(
-            Call.status,
-            func.count(Call.id)
+    # Postgres builds each distribution as a JSON object, so the whole summary is one row
+    def distribution(column, source):
+        counts = (
+            select(func.coalesce(column, "unknown").label("key"), func.count().label("n"))
+            .select_from(source)
+            .group_by(column)
+            .subquery()
         )
-        .group_by(Call.status)
-        .all()
-    )
-
-    # Average call duration
-    avg_duration = call_query.with_entities(func.avg(Call.call_duration)).scalar() or 0
+        return select(func.jsonb_object_agg(counts.c.key, counts.c.n)).scalar_subquery()
+
+    row = (
+        await db.execute(
+            select(
+                select(func.count()).select_from(calls).scalar_subquery(),
+                select(func.count()).select_from(analyses).scalar_subquery(),
+                select(func.avg(calls.c.call_duration)).scalar_subquery(),
+                distribution(analyses.c.overall_sentiment, analyses),
+                distribution(analyses.c.resolution_status, analyses),
+                distribution(analyses.c.call_efficiency, analyses),
+                distribution(calls.c.status, calls),
+            )
+        )
+    ).one()
+    total_calls, total_analyzed, avg_duration, sentiments, resolutions, efficiencies, statuses = row
 
-    return {
+    summary = {
         "total_calls": total_calls,
         "total_analyzed": total_analyzed,
-        "average_duration_seconds": round(avg_duration, 2),
-        "sentiment_distribution": {s[0] or "unknown": s[1] for s in sentiment_counts},
-        "resolution_distribution": {r[0] or "unknown": r[1] for r in resolution_counts},
-        "efficiency_distribution": {e[0] or "unknown": e[1] for e in efficiency_counts},
-        "status_distribution": {s[0]: s[1] for s in status_counts},
+        "average_duration_seconds": round(avg_duration or 0, 2),
+        # jsonb_object_agg yields NULL over no rows
+        "sentiment_distribution": sentiments or {},
+        "resolution_distribution": resolutions or {},
+        "efficiency_distribution": efficiencies or {},
+        "status_distribution": statuses or {},
     }
+    _analytics_cache[scope] = summary
+    return summary
+
+
+def _delete_call_audio(file_url: str) -> None:
+    """Delete a deleted call's audio from GCS, handing failures to the gc_blob task."""
+    try:
+        delete_blob_from_url(file_url)
+        logger.info(f"Deleted audio file: {file_url}")
+    except NotFound:
+        logger.info(f"Audio file already deleted: {file_url}")
+    except Exception as e:
+        logger.error(f"Error deleting audio file, scheduling retry: {e}")
+        celery.send_task("gc_blob", args=[file_url])
 
 
 @router.delete("/call/{call_id}")
-def delete_call(
+async def delete_call(
     call_id: int,
-    db: Session = Depends(get_db),
+    background_tasks: BackgroundTasks,
+    db: AsyncSession = Depends(get_async_db),
     auth_user: User = Depends(get_user),
 ):
     """
     Delete a call recording and its associated audio file and analysis.
 
+    The audio file is removed from GCS in the background after the response.
+
     Only admins or the agent who created the call can delete it.
     Cascade delete will remove associated speech analysis and all related records.
 
@@ -487,7 +650,18 @@ def delete_call(
         HTTPException 404: If call not found
         HTTPException 403: If user not authorized to delete
     """
-    call = db.query(Call).filter(Call.id == call_id).first()
+    # The ORM cascade walks the analysis and its children, so load them up front
+    call = await db.get(
+        Call,
+        call_id,
+        options=[
+            selectinload(Call.speech_analysis).selectinload(SpeechAnalysis.intents),
+            selectinload(Call.speech_analysis).selectinload(SpeechAnalysis.extracted_entities),
+            selectinload(Call.speech_analysis).selectinload(SpeechAnalysis.issues),
+            selectinload(Call.speech_analysis).selectinload(SpeechAnalysis.actions),
+            selectinload(Call.speech_analysis).selectinload(SpeechAnalysis.keypoints),
+        ],
+    )
 
     if not call:
         raise HTTPException(status_code=404, detail="Call not found")
@@ -496,18 +670,15 @@ def delete_call(
     if auth_user.role != "admin" and call.agent_id != auth_user.id:
         raise HTTPException(status_code=403, detail="Not authorized to delete this call")
 
-    # Delete the audio file from GCS
-    try:
-        if call.file_id:
-            delete_blob_from_url(call.file_id)
-            logger.info(f"Deleted audio file: {call.file_id}")
-    except Exception as e:
-        logger.error(f"Error deleting audio file: {e}")
-        # Continue with database deletion even if file deletion fails
+    file_url = call.file_id
 
     # Delete the call record from database (cascade will delete analysis)
-    db.delete(call)
-    db.commit()
+    await db.delete(call)
+    await db.commit()
+
+    # Delete the audio file from GCS once the response has been sent
+    if file_url:
+        background_tasks.add_task(_delete_call_audio, file_url)
 
     logger.info(f"User {auth_user.email} deleted call {call_id}")
     return {"message": "Call deleted successfully"}
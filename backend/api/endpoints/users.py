@@ -5,25 +5,38 @@ This module provides REST API endpoints for user authentication and management.
 Supports JWT-based authentication with role-based access control.
 """
 
+import asyncio
+import hashlib
 from datetime import datetime
 from typing import List, NoReturn, Optional, Union
 
-from fastapi import APIRouter, Depends, HTTPException, status
+from cachetools import TTLCache
+from fastapi import APIRouter, Depends, HTTPException, Query, status
 from fastapi.security import OAuth2PasswordRequestForm
 from passlib.context import CryptContext
-from sqlalchemy.orm import Session
+from sqlalchemy import exists, select
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from api import schemas
-from api.deps import get_db, get_user_optional
+from api.deps import get_async_db, get_user_optional
+from core.config import settings
 from db.models.user import User
 from utils.jwt import JWT
 
 
 router = APIRouter(prefix="/users", tags=["Users"])
-pass_ctx = CryptContext(schemes=["bcrypt"], deprecated="auto")
+pass_ctx = CryptContext(
+    schemes=["bcrypt"], deprecated="auto", bcrypt__rounds=settings.BCRYPT_ROUNDS
+)
 
+# Recently failed credentials, so repeated attempts are refused without rerunning bcrypt.
+# Only failures are cached, under a hash, and only briefly.
+_failed_logins = TTLCache(maxsize=4096, ttl=2)
 
-def authorize(db: Session, email: str, password: str) -> Union[schemas.TokenResponse, NoReturn]:
+
+async def authorize(
+    db: AsyncSession, email: str, password: str
+) -> Union[schemas.TokenResponse, NoReturn]:
     """
     Authenticate user credentials and generate JWT token.
 
@@ -38,28 +51,33 @@ def authorize(db: Session, email: str, password: str) -> Union[schemas.TokenResp
     Raises:
         HTTPException 401: Invalid credentials
     """
-    user = db.query(User).filter(User.email == email).first()
-
-    if not user or not pass_ctx.verify(password, user.password):
+    attempt = hashlib.sha256(f"{email}|{password}".encode()).digest()
+    user = None
+    if attempt not in _failed_logins:
+        user = await db.scalar(select(User).where(User.email == email))
+
+    # bcrypt is deliberately slow, keep it off the event loop
+    if not user or not await asyncio.to_thread(pass_ctx.verify, password, user.password):
+        _failed_logins[attempt] = True
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect username or password",
             headers={"WWW-Authenticate": "Bearer"},
         )
 
-    token = JWT.create_access_token(user.email)
+    token = JWT.create_access_token(user.email, role=user.role)
     return schemas.TokenResponse(access_token=token)
 
 
 @router.post("/authorize-swagger", response_model=schemas.TokenResponse, include_in_schema=False)
 async def authorize_swagger(
-    auth_data: OAuth2PasswordRequestForm = Depends(), db: Session = Depends(get_db)
+    auth_data: OAuth2PasswordRequestForm = Depends(), db: AsyncSession = Depends(get_async_db)
 ):
-    return authorize(db, auth_data.username, auth_data.password)
+    return await authorize(db, auth_data.username, auth_data.password)
 
 
 @router.post("/authorize", response_model=schemas.TokenResponse)
-async def authorize_user(auth_data: schemas.UserAuth, db: Session = Depends(get_db)):
+async def authorize_user(auth_data: schemas.UserAuth, db: AsyncSession = Depends(get_async_db)):
     """
     Authenticate user and return JWT access token.
 
@@ -69,13 +87,13 @@ async def authorize_user(auth_data: schemas.UserAuth, db: Session = Depends(get_
     Returns:
         JWT access token for authenticated requests
     """
-    return authorize(db, auth_data.email, auth_data.password)
+    return await authorize(db, auth_data.email, auth_data.password)
 
 
 @router.post("/", response_model=schemas.User)
-def create_user(
+async def create_user(
     user: schemas.UserCreate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     auth_user: Optional[User] = Depends(get_user_optional),
 ):
     """
@@ -94,7 +112,7 @@ def create_user(
         HTTPException 400: Email already registered
         HTTPException 403: Non-admin trying to set role
     """
-    if User.exists(db, email=user.email):
+    if await db.scalar(select(exists().where(User.email == user.email))):
         raise HTTPException(status_code=400, detail="Email already registered")
 
     if (not auth_user or auth_user.role != "admin") and user.role:
@@ -108,7 +126,7 @@ def create_user(
 
     new_user = User(
         email=str(user.email),
-        password=pass_ctx.hash(user.password),
+        password=await asyncio.to_thread(pass_ctx.hash, user.password),
         first_name=user.first_name,
         last_name=user.last_name,
         role=user.role,
@@ -117,18 +135,38 @@ def create_user(
     )
 
     db.add(new_user)
-    db.commit()
-    db.refresh(new_user)
+    await db.commit()
+    await db.refresh(new_user)
 
     return new_user
 
 
 @router.get("/", response_model=List[schemas.User])
-def list_users(db: Session = Depends(get_db)):
+async def list_users(
+    db: AsyncSession = Depends(get_async_db),
+    limit: Optional[int] = Query(
+        None, ge=1, le=1000, description="Maximum number of users to return"
+    ),
+    after_id: Optional[int] = Query(
+        None, description="Return users with an ID greater than this one"
+    ),
+):
     """
-    List all registered users.
+    List registered users, ordered by ID.
+
+    Only the columns of the response schema are read, so password hashes
+    never leave the database. Pages are keyset-based: pass the last ID of
+    a page as after_id to get the next one.
+
+    Args:
+        limit: Page size; all users when omitted
+        after_id: Last user ID of the previous page
 
     Returns:
         List of User objects
     """
-    return db.query(User).all()
+    query = select(*(getattr(User, name) for name in schemas.User.model_fields)).order_by(User.id)
+    if after_id is not None:
+        query = query.where(User.id > after_id)
+
+    return (await db.execute(query.limit(limit))).mappings().all()
@@ -5,7 +5,7 @@ Pydantic schemas for Action model.
 from datetime import datetime
 from uuid import UUID
 
-from pydantic import BaseModel
+from pydantic import BaseModel, ConfigDict
 
 
 class ActionBase(BaseModel):
@@ -21,5 +21,4 @@ class Action(ActionBase):
     id: UUID
     created_at: datetime
 
-    class Config:
-        from_attributes = True
+    model_config = ConfigDict(from_attributes=True)
@@ -6,12 +6,12 @@ from datetime import datetime
 from typing import Optional
 from uuid import UUID
 
-from pydantic import BaseModel
+from pydantic import BaseModel, ConfigDict
 
 from api.schemas.speech_analysis import SpeechAnalysis, SpeechAnalysisSummary
 
 
-__all__ = ["CallCreate", "CallUpdate", "Call", "CallWithAnalysis"]
+__all__ = ["CallCreate", "CallUpdate", "Call", "CallWithAnalysisSummary", "CallWithAnalysis"]
 
 
 class CallBase(BaseModel):
@@ -35,21 +35,14 @@ class Call(CallBase):
     celery_task_id: Optional[str] = None
     created_at: datetime
 
-    class Config:
-        from_attributes = True
+    model_config = ConfigDict(from_attributes=True)
 
 
 class CallWithAnalysisSummary(Call):
     """Call with simplified analysis summary for list views."""
     speech_analysis: Optional[SpeechAnalysisSummary] = None
 
-    class Config:
-        from_attributes = True
-
 
 class CallWithAnalysis(Call):
     """Call with full analysis data for detail views."""
     speech_analysis: Optional[SpeechAnalysis] = None
-
-    class Config:
-        from_attributes = True
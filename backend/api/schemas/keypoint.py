@@ -5,7 +5,7 @@ Pydantic schemas for Keypoint model.
 from datetime import datetime
 from uuid import UUID
 
-from pydantic import BaseModel
+from pydantic import BaseModel, ConfigDict
 
 
 class KeypointBase(BaseModel):
@@ -20,5 +20,4 @@ class Keypoint(KeypointBase):
     id: UUID
     created_at: datetime
 
-    class Config:
-        from_attributes = True
+    model_config = ConfigDict(from_attributes=True)
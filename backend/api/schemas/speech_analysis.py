@@ -6,7 +6,7 @@ from datetime import datetime
 from typing import List, Optional, Any, Dict
 from uuid import UUID
 
-from pydantic import BaseModel
+from pydantic import BaseModel, ConfigDict
 
 from api.schemas.action import Action
 from api.schemas.extracted_entity import ExtractedEntity
@@ -51,8 +51,7 @@ class SpeechAnalysis(SpeechAnalysisBase):
     actions: List[Action] = []
     keypoints: List[Keypoint] = []
 
-    class Config:
-        from_attributes = True
+    model_config = ConfigDict(from_attributes=True)
 
 
 class SpeechAnalysisSummary(BaseModel):
@@ -64,5 +63,4 @@ class SpeechAnalysisSummary(BaseModel):
     resolution_status: Optional[str] = None
     created_at: datetime
 
-    class Config:
-        from_attributes = True
+    model_config = ConfigDict(from_attributes=True)
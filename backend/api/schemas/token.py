@@ -1,9 +1,12 @@
+from typing import Optional
+
 from pydantic import BaseModel
 
 
 class TokenPayload(BaseModel):
     sub: str
     exp: int
+    role: Optional[str] = None
 
 
 class TokenResponse(BaseModel):
@@ -1,7 +1,7 @@
 from datetime import datetime
 from typing import List, Optional
 
-from pydantic import BaseModel, EmailStr
+from pydantic import BaseModel, ConfigDict, EmailStr
 
 # from db.models.call import Call
 
@@ -27,9 +27,7 @@ class User(BaseModel):
     created_at: datetime
     # calls: List['Call'] = []
 
-    class Config:
-        # arbitrary_types_allowed = True
-        from_attributes = True
+    model_config = ConfigDict(from_attributes=True)
 
 
 class UserCreate(BaseModel):
@@ -39,9 +37,7 @@ class UserCreate(BaseModel):
     role: Optional[str] = None
     password: str
 
-    class Config:
-        populate_by_name = True
-        alias_generator = to_camel_case
+    model_config = ConfigDict(populate_by_name=True, alias_generator=to_camel_case)
 
 
 class UserAuth(BaseModel):
@@ -57,9 +53,7 @@ class UserUpdate(BaseModel):
     is_active: Optional[bool] = None
     password: Optional[str] = None
 
-    class Config:
-        populate_by_name = True
-        alias_generator = to_camel_case
+    model_config = ConfigDict(populate_by_name=True, alias_generator=to_camel_case)
 
 
 # Remove this nigga later
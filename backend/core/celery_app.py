@@ -24,11 +24,21 @@ celery = Celery(
 )
 
 celery.conf.update(
-    task_serializer="pickle",
-    result_serializer="pickle",
-    accept_content=["json", "pickle"],  # Accept both JSON and pickle
+    task_serializer="json",
+    result_serializer="json",
+    accept_content=["json"],  # Nothing read from the broker or result backend is unpickled
     broker_connection_retry_on_startup=True,
     result_expires=None,  # Never expire results
+    # Analysis tasks run for seconds to many minutes; each worker process reserves
+    # only the task it's running, and acknowledges it once done so a crashed
+    # worker's task is redelivered instead of lost
+    worker_prefetch_multiplier=1,
+    task_acks_late=True,
+    task_reject_on_worker_lost=True,
+    # Redis redelivers unacknowledged tasks after this long, keep it above the longest task
+    broker_transport_options={"visibility_timeout": 4 * 3600},
+    # Long audio analysis gets its own queue, so short tasks don't wait behind it
+    task_routes={"core.tasks.convert_audio_to_text": {"queue": "stt_heavy"}},
 )
 
 
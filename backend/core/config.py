@@ -7,6 +7,7 @@ Environment variables are loaded from a .env file and validated at startup.
 
 import sys
 from pathlib import Path
+from typing import Optional
 
 from dotenv import load_dotenv
 from loguru import logger
@@ -27,22 +28,39 @@ class Settings(BaseSettings):
 
     Attributes:
         DATABASE_URL: PostgreSQL connection string
+        PGBOUNCER_URL: Optional PgBouncer (transaction pooling) URL used by the app
+            instead of DATABASE_URL
+        SQLALCHEMY_POOL_SIZE: Persistent connections kept per engine
+        SQLALCHEMY_MAX_OVERFLOW: Extra connections allowed beyond the pool size
         REDIS_URL: Redis connection string for Celery broker
+        REDIS_SOCK: Optional Redis UNIX socket path used by the cache instead of REDIS_URL
+        REDIS_POOL: Maximum connections in the shared cache pool
         JWT_KEY: Secret key for JWT token signing
+        BCRYPT_ROUNDS: Cost factor for newly hashed passwords
         DEBUG: Enable debug mode and verbose logging
         BUCKET_NAME: Google Cloud Storage bucket name
         PYANNOTEAI_TOKEN: API token for PyAnnote AI diarization
+        PYANNOTEAI_MAX_WAIT: Seconds a diarization job may run before the call is failed
         OPENAI_API_KEY: OpenAI API key for conversation analysis
         AISHA_API_KEY: AISHA STT service API key
+        STT_PARALLELISM: Maximum in-flight AISHA requests per transcription task
     """
     DATABASE_URL: str
+    PGBOUNCER_URL: Optional[str] = None
+    SQLALCHEMY_POOL_SIZE: int = 20
+    SQLALCHEMY_MAX_OVERFLOW: int = 10
     REDIS_URL: str
+    REDIS_SOCK: Optional[str] = None
+    REDIS_POOL: int = 64
     JWT_KEY: str
+    BCRYPT_ROUNDS: int = 12
     DEBUG: bool
     BUCKET_NAME: str = "ovozly-bucket"
     PYANNOTEAI_TOKEN: str
+    PYANNOTEAI_MAX_WAIT: int = 3 * 3600
     OPENAI_API_KEY: str
     AISHA_API_KEY: str
+    STT_PARALLELISM: int = 16
 
     @field_validator("DEBUG", mode="before")
     def validate_debug(cls, value):
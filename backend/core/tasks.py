@@ -7,26 +7,36 @@ and AI-powered conversation analysis.
 """
 
 import sys
+import time
+from io import BytesIO
 from pathlib import Path
-from typing import Any, Dict, List
+from typing import Any, Dict, List, Optional
+
+from celery.exceptions import Ignore, Retry
+from google.api_core.exceptions import NotFound, ServerError, TooManyRequests
+from loguru import logger
+from requests.exceptions import ConnectionError as RequestsConnectionError
+from requests.exceptions import Timeout
+from sqlalchemy import insert, select, update
 
 # Ensure the backend directory is in Python path for imports
 _backend_dir = Path(__file__).parent.parent
 if str(_backend_dir) not in sys.path:
     sys.path.insert(0, str(_backend_dir))
 
-import time
-from io import BytesIO
-
-from celery.exceptions import Ignore
-from loguru import logger
-
 from ai.openai import analyze_conversation
-from ai.pyannoteai import PyAnnoteAI_Status, pyannoteai
+from ai.pyannoteai import PyAnnoteAI, PyAnnoteAI_Status, pyannoteai
 from ai.aisha_stt import transcribe_with_diarization
 from core.base_task import BaseTask
 from core.celery_app import celery
+from core.config import settings
 from db import Call, SpeechAnalysis, Intent, ExtractedEntity, Issue, Action, Keypoint
+from utils.bucket import delete_blob_from_url, download_blob_from_url
+
+
+# Diarization is polled by re-scheduling the task: 1, 2, 4, 8, 16, then every 30 seconds,
+# giving up once the job has run for settings.PYANNOTEAI_MAX_WAIT seconds
+DIARIZATION_POLL_MAX_DELAY = 30
 
 
 def set_state(self, msg: str) -> None:
@@ -35,6 +45,12 @@ def set_state(self, msg: str) -> None:
     self.update_state(state="RUNNING", meta={"detail": msg.capitalize()})
 
 
+def _insert_rows(session, model, rows: List[Dict[str, Any]]) -> None:
+    """Insert rows of a model in one executemany; column defaults still apply."""
+    if rows:
+        session.execute(insert(model), rows)
+
+
 def save_analysis_to_db(
     session,
     call_id: int,
@@ -79,57 +95,64 @@ def save_analysis_to_db(
     session.add(speech_analysis)
     session.flush()  # Get the ID for related records
 
-    # Save intents
-    for intent_data in speech_data.get("intent_detection", []):
-        intent = Intent(
-            analysis_id=speech_analysis.id,
-            intent=intent_data.get("intent", ""),
-            confidence_score=intent_data.get("confidence_score"),
-        )
-        session.add(intent)
-
-    # Save extracted entities
-    for entity_data in speech_data.get("entities_extracted", []):
-        entity = ExtractedEntity(
-            analysis_id=speech_analysis.id,
-            entity_type=entity_data.get("entity_type", ""),
-            value=entity_data.get("value", ""),
-            confidence_score=entity_data.get("confidence_score"),
-        )
-        session.add(entity)
-
-    # Save identified issues
-    for issue_data in speech_data.get("issues_identified", []):
-        issue = Issue(
-            analysis_id=speech_analysis.id,
-            issue_type=issue_data.get("issue_type", ""),
-            description=issue_data.get("description", ""),
-        )
-        session.add(issue)
-
-    # Save recommended actions
-    for action_data in actions_data:
-        action = Action(
-            analysis_id=speech_analysis.id,
-            action_type=action_data.get("action_type", ""),
-            details=action_data.get("details", ""),
-        )
-        session.add(action)
-
-    # Save key points
-    for point_text in summary_data.get("key_points", []):
-        keypoint = Keypoint(
-            analysis_id=speech_analysis.id,
-            point=point_text,
-        )
-        session.add(keypoint)
+    # Child rows are written as plain dicts, one multi-row INSERT per table,
+    # without building ORM objects for them
+    analysis_id = speech_analysis.id
+
+    _insert_rows(session, Intent, [
+        {
+            "analysis_id": analysis_id,
+            "intent": intent_data.get("intent", ""),
+            "confidence_score": intent_data.get("confidence_score"),
+        }
+        for intent_data in speech_data.get("intent_detection", [])
+    ])
+
+    _insert_rows(session, ExtractedEntity, [
+        {
+            "analysis_id": analysis_id,
+            "entity_type": entity_data.get("entity_type", ""),
+            "value": entity_data.get("value", ""),
+            "confidence_score": entity_data.get("confidence_score"),
+        }
+        for entity_data in speech_data.get("entities_extracted", [])
+    ])
+
+    _insert_rows(session, Issue, [
+        {
+            "analysis_id": analysis_id,
+            "issue_type": issue_data.get("issue_type", ""),
+            "description": issue_data.get("description", ""),
+        }
+        for issue_data in speech_data.get("issues_identified", [])
+    ])
+
+    _insert_rows(session, Action, [
+        {
+            "analysis_id": analysis_id,
+            "action_type": action_data.get("action_type", ""),
+            "details": action_data.get("details", ""),
+        }
+        for action_data in actions_data
+    ])
+
+    _insert_rows(session, Keypoint, [
+        {"analysis_id": analysis_id, "point": point_text}
+        for point_text in summary_data.get("key_points", [])
+    ])
 
     logger.info(f"Saved analysis for call {call_id} with ID {speech_analysis.id}")
     return speech_analysis
 
 
-@celery.task(base=BaseTask, serializer="pickle", bind=True)
-def convert_audio_to_text(self, audio_raw: bytes, audio_ext: str, call_id: int) -> Dict[str, Any]:
+@celery.task(base=BaseTask, bind=True, max_retries=None)
+def convert_audio_to_text(
+    self,
+    audio_ext: str,
+    call_id: int,
+    job_id: Optional[str] = None,
+    submitted_at: Optional[float] = None,
+) -> Dict[str, Any]:
     """
     Process audio file through the complete analysis pipeline.
 
@@ -140,10 +163,15 @@ def convert_audio_to_text(self, audio_raw: bytes, audio_ext: str, call_id: int)
     4. Analyze conversation using OpenAI GPT
     5. Persist all results to PostgreSQL
 
+    While diarization runs, the task doesn't hold its worker: it checks the
+    job once and re-schedules itself with the job ID, backing off between
+    checks.
+
     Args:
-        audio_raw: Raw audio file bytes
         audio_ext: Audio file extension (e.g., 'wav', 'mp3', 'm4a')
         call_id: Database ID of the Call record
+        job_id: PyAnnote job ID, set when re-scheduled to poll a submitted job
+        submitted_at: Unix time the job was submitted, set together with job_id
 
     Returns:
         Analysis results dict with call_id for reference
@@ -152,41 +180,43 @@ def convert_audio_to_text(self, audio_raw: bytes, audio_ext: str, call_id: int)
         Ignore: When diarization fails (task marked as FAIL)
         Exception: On any processing error (task marked as FAIL)
     """
-    call = self.session.query(Call).filter(Call.id == call_id).one()
+    # Only the audio URL is read; the status is written with a single UPDATE once
+    # the task finishes, whichever way it ends
+    file_url = self.session.execute(select(Call.file_id).where(Call.id == call_id)).scalar_one()
+    # End the read transaction, so no pooled connection is held while the external APIs run
+    self.session.rollback()
+    final_status = "FAIL"
     try:
-        audio = BytesIO(audio_raw)
-        set_state(self, "loading audio file")
-
-        # Step 1: Submit to PyAnnote for diarization
-        status, job_id = pyannoteai.submit(call.file_id)
-        logger.debug(f"pyannoteai {job_id=}")
-
-        if not job_id:
-            logger.error("diarization submit error, status: %s", status)
-            call.status = "FAIL"
-            self.session.commit()
-            self.update_state(
-                state="FAIL",
-                meta={"status": status, "detail": "pyannoteai submit error"},
-            )
-            raise Ignore()
-
+        # Step 1: Submit to PyAnnote for diarization, unless this run is a poll
+        if job_id is None:
+            status, job_id = pyannoteai.submit(file_url)
+            logger.debug(f"pyannoteai {job_id=}")
+
+            if not job_id:
+                logger.error("diarization submit error, status: {}", status)
+                self.update_state(
+                    state="FAIL",
+                    meta={"status": status, "detail": "pyannoteai submit error"},
+                )
+                raise Ignore()
+
+        # The wait is measured from the first run that knew the job
+        if submitted_at is None:
+            submitted_at = time.time()
+
+        # Step 2: Check on the diarization, and come back later while it's still running
         set_state(self, "audio submitted, waiting for diarization...")
-
-        # Step 2: Wait for diarization to complete
         status, diarization_data = pyannoteai.check_job(job_id)
-        while status in (
-            PyAnnoteAI_Status.CREATED,
-            PyAnnoteAI_Status.PENDING,
-            PyAnnoteAI_Status.RUNNING,
-        ):
-            time.sleep(1)
-            status, diarization_data = pyannoteai.check_job(job_id)
+
+        waited = time.time() - submitted_at
+        if status in PyAnnoteAI.IN_PROGRESS and waited < settings.PYANNOTEAI_MAX_WAIT:
+            raise self.retry(
+                kwargs={"job_id": job_id, "submitted_at": submitted_at},
+                countdown=min(2**self.request.retries, DIARIZATION_POLL_MAX_DELAY),
+            )
 
         if status != PyAnnoteAI_Status.SUCCEEDED:
-            logger.error("diarization error, status: %s, details: %s", status, diarization_data)
-            call.status = "FAIL"
-            self.session.commit()
+            logger.error("diarization error, status: {}, details: {}", status, diarization_data)
             self.update_state(
                 state="FAIL",
                 meta={
@@ -198,12 +228,10 @@ def convert_audio_to_text(self, audio_raw: bytes, audio_ext: str, call_id: int)
 
         if not diarization_data.get("output"):
             logger.error(
-                "diarization error, status: %s, details: %s",
+                "diarization error, status: {}, details: {}",
                 status,
                 "diarization got no `output` field",
             )
-            call.status = "FAIL"
-            self.session.commit()
             self.update_state(
                 state="FAIL",
                 meta={"status": "FAIL", "detail": "diarization got no `output` field"},
@@ -212,12 +240,10 @@ def convert_audio_to_text(self, audio_raw: bytes, audio_ext: str, call_id: int)
 
         if "diarization" not in diarization_data["output"]:
             logger.error(
-                "diarization error, status: %s, details: %s",
+                "diarization error, status: {}, details: {}",
                 status,
                 "diarization got no `diarization` field",
             )
-            call.status = "FAIL"
-            self.session.commit()
             self.update_state(
                 state="FAIL",
                 meta={
@@ -227,17 +253,21 @@ def convert_audio_to_text(self, audio_raw: bytes, audio_ext: str, call_id: int)
             )
             raise Ignore()
 
+        # Fetch the audio from the bucket once the diarization is ready
+        set_state(self, "loading audio file")
+        audio = BytesIO(download_blob_from_url(file_url))
+
         diarization_segments = diarization_data["output"]["diarization"]
         logger.debug(f"Got {len(diarization_segments)} diarization segments")
 
         # Step 3: Transcribe audio segments using AISHA (with speaker mapping)
         set_state(self, "transcribing audio with AISHA...")
-        audio.seek(0)
         diarization_with_text = transcribe_with_diarization(
             audio_file=audio,
             audio_ext=audio_ext,
             diarization_segments=diarization_segments,
             language="uz",
+            max_workers=settings.STT_PARALLELISM,
         )
         logger.debug(f"AISHA transcription complete: {len(diarization_with_text)} segments")
 
@@ -254,12 +284,20 @@ def convert_audio_to_text(self, audio_raw: bytes, audio_ext: str, call_id: int)
             diarization_with_text=diarization_with_text,
         )
 
-        call.status = "SUCCESS"
-        self.session.commit()
+        final_status = "SUCCESS"
 
         # Return analysis with call_id for reference
         return {"call_id": call_id, "status": "SUCCESS", **analysis}
 
+    except Retry:
+        # Diarization is still running, the call stays RUNNING until a later run
+        final_status = None
+        raise
+
+    except Ignore:
+        # Failure already recorded in the task state
+        raise
+
     except Exception as e:
         logger.error(f"error occurred while processing the audio: {e}")
         self.update_state(
@@ -269,6 +307,36 @@ def convert_audio_to_text(self, audio_raw: bytes, audio_ext: str, call_id: int)
                 "detail": f"error occurred while processing the audio: {e}",
             },
         )
-        call.status = "FAIL"
-        self.session.commit()
         raise
+
+    finally:
+        if final_status is not None:
+            # A failure discards whatever part of the analysis was written
+            if final_status == "FAIL":
+                self.session.rollback()
+            self.session.execute(update(Call).where(Call.id == call_id).values(status=final_status))
+            self.session.commit()
+
+
+# Storage failures worth retrying: server-side errors, rate limiting and network trouble
+_TRANSIENT_STORAGE_ERRORS = (ServerError, TooManyRequests, RequestsConnectionError, Timeout)
+
+
+@celery.task(name="gc_blob", bind=True, max_retries=5, default_retry_delay=60)
+def gc_blob(self, file_url: str) -> None:
+    """
+    Delete an audio blob left behind by a deleted call.
+
+    Queued when the in-process deletion after a call delete fails, and
+    retried while the storage errors are transient. A blob that is already
+    gone counts as deleted.
+
+    Args:
+        file_url: Public URL of the blob to delete
+    """
+    try:
+        delete_blob_from_url(file_url)
+    except NotFound:
+        logger.info("Blob already deleted: {}", file_url)
+    except _TRANSIENT_STORAGE_ERRORS as e:
+        raise self.retry(exc=e)
@@ -1,17 +1,48 @@
+import orjson
 import redis
-import pickle
+from celery.signals import worker_process_init
 from flipcache import FlipCache
 from sqlalchemy.ext.declarative import declarative_base
 
+from core.config import settings
+
 
 Base = declarative_base()
 
-rd = redis.Redis()
+# One bounded, shared pool for every cache read. Callers wait for a free
+# connection instead of opening new ones, and idle sockets are kept alive and
+# health-checked. A local UNIX socket skips the TCP stack entirely.
+_POOL_OPTIONS = {
+    "max_connections": settings.REDIS_POOL,
+    "timeout": 5,
+    "socket_keepalive": True,
+    "health_check_interval": 30,
+}
+
+if settings.REDIS_SOCK:
+    pool = redis.BlockingConnectionPool(
+        connection_class=redis.UnixDomainSocketConnection,
+        path=settings.REDIS_SOCK,
+        **_POOL_OPTIONS,
+    )
+else:
+    pool = redis.BlockingConnectionPool.from_url(settings.REDIS_URL, **_POOL_OPTIONS)
+
+rd = redis.Redis(connection_pool=pool)
+
+
+@worker_process_init.connect
+def _reset_redis_pool(**kwargs):
+    # Forked workers must not share the parent's sockets
+    pool.disconnect()
+
 
 cache = FlipCache(
     name="my_cache",
     value_type="custom",
     redis_protocol=rd,
-    value_encoder=lambda x: pickle.dumps(x),
-    value_decoder=lambda x: pickle.loads(x, encoding="utf-8"),
+    # JSON rather than pickle: smaller for dict/list payloads, faster, and a
+    # tampered cache entry cannot execute code on load
+    value_encoder=orjson.dumps,
+    value_decoder=orjson.loads,
 )
@@ -0,0 +1,39 @@
+"""add_call_list_indexes
+
+Revision ID: 8d3f1a7c2b64
+Revises: 5a2b8c3d9e1f
+
+Composite indexes backing the filters and sort orders of the call list,
+and an index for the filename lookup on upload.
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = "8d3f1a7c2b64"
+down_revision: Union[str, None] = "5a2b8c3d9e1f"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index("ix_calls_agent_id_created_at", "calls", ["agent_id", "created_at"])
+    op.create_index("ix_calls_status_created_at", "calls", ["status", "created_at"])
+    op.create_index("ix_calls_agent_id_call_duration", "calls", ["agent_id", "call_duration"])
+    op.create_index("ix_calls_file_name", "calls", ["file_name"])
+    op.create_index(
+        "ix_speech_analysis_call_id_sentiment_resolution",
+        "speech_analysis",
+        ["call_id", "overall_sentiment", "resolution_status"],
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_speech_analysis_call_id_sentiment_resolution", table_name="speech_analysis")
+    op.drop_index("ix_calls_file_name", table_name="calls")
+    op.drop_index("ix_calls_agent_id_call_duration", table_name="calls")
+    op.drop_index("ix_calls_status_created_at", table_name="calls")
+    op.drop_index("ix_calls_agent_id_created_at", table_name="calls")
@@ -6,7 +6,7 @@ Represents a call recording submitted for analysis.
 
 from datetime import datetime
 
-from sqlalchemy import Column, DateTime, Double, ForeignKey, Integer, String
+from sqlalchemy import Column, DateTime, Double, ForeignKey, Index, Integer, String
 from sqlalchemy.orm import relationship
 
 from db.base import Base
@@ -28,6 +28,14 @@ class Call(Base):
     """
 
     __tablename__ = "calls"
+    __table_args__ = (
+        # Back the per-agent / per-status call list and its sort orders
+        Index("ix_calls_agent_id_created_at", "agent_id", "created_at"),
+        Index("ix_calls_status_created_at", "status", "created_at"),
+        Index("ix_calls_agent_id_call_duration", "agent_id", "call_duration"),
+        # Uniqueness checks of the display filename on upload
+        Index("ix_calls_file_name", "file_name"),
+    )
 
     id = Column(Integer, primary_key=True, autoincrement=True)
     file_id = Column(String, nullable=False)
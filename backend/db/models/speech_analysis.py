@@ -7,7 +7,7 @@ Represents the AI-generated analysis results for a call recording.
 import uuid
 from datetime import datetime
 
-from sqlalchemy import Column, DateTime, ForeignKey, Integer, String, Text
+from sqlalchemy import Column, DateTime, ForeignKey, Index, Integer, String, Text
 from sqlalchemy.dialects.postgresql import UUID, JSONB
 from sqlalchemy.orm import relationship
 
@@ -44,6 +44,13 @@ class SpeechAnalysis(Base):
     """
 
     __tablename__ = "speech_analysis"
+    __table_args__ = (
+        # Covers the sentiment / resolution filters of the call list join
+        Index(
+            "ix_speech_analysis_call_id_sentiment_resolution",
+            "call_id", "overall_sentiment", "resolution_status",
+        ),
+    )
 
     id = Column(UUID(as_uuid=True), primary_key=True, index=True, default=uuid.uuid4)
     call_id = Column(ForeignKey("calls.id"), nullable=False, unique=True)
@@ -1,10 +1,50 @@
-from sqlalchemy import create_engine
+from uuid import uuid4
+
+from sqlalchemy import create_engine, make_url
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
 from sqlalchemy.orm import sessionmaker
 from core.config import settings
 
 
+# Options shared by both engines. The pool drops dead connections before use
+# and recycles them hourly, before server-side idle timeouts kick in. The
+# compiled statement cache is enlarged so every filter/sort combination of
+# the list endpoints stays compiled.
+ENGINE_OPTIONS = {
+    "pool_size": settings.SQLALCHEMY_POOL_SIZE,
+    "max_overflow": settings.SQLALCHEMY_MAX_OVERFLOW,
+    "pool_timeout": 30,
+    "pool_pre_ping": True,
+    "pool_recycle": 3600,
+    "query_cache_size": 1200,
+}
+
+# The app goes through PgBouncer when one is configured, migrations keep
+# talking to PostgreSQL directly through DATABASE_URL
+DATABASE_URL = make_url(settings.PGBOUNCER_URL or settings.DATABASE_URL)
+
 # Create the database engine
-engine = create_engine(settings.DATABASE_URL)
+engine = create_engine(DATABASE_URL, **ENGINE_OPTIONS)
 
 # Session local for database interactions
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+# Async engine on the same database through asyncpg, for request dependencies
+# that shouldn't be dispatched to the threadpool
+ASYNC_DATABASE_URL = DATABASE_URL.set(drivername="postgresql+asyncpg")
+ASYNC_ENGINE_OPTIONS = dict(ENGINE_OPTIONS)
+
+# PgBouncer in transaction mode may run each transaction on a different server
+# connection, so asyncpg must neither cache prepared statements nor reuse their names
+if settings.PGBOUNCER_URL:
+    ASYNC_DATABASE_URL = ASYNC_DATABASE_URL.update_query_dict(
+        {"prepared_statement_cache_size": "0"}
+    )
+    ASYNC_ENGINE_OPTIONS["connect_args"] = {
+        "statement_cache_size": 0,
+        "prepared_statement_name_func": lambda: f"__asyncpg_{uuid4()}__",
+    }
+
+async_engine = create_async_engine(ASYNC_DATABASE_URL, **ASYNC_ENGINE_OPTIONS)
+
+AsyncSessionLocal = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
@@ -6,16 +6,29 @@ call center analytics platform. It sets up CORS middleware and registers all
 API route handlers.
 """
 
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import ORJSONResponse
 
+from ai import aisha_ai
 from api.endpoints import stt, users
 
 
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Close shared HTTP clients on shutdown."""
+    yield
+    await aisha_ai.async_client.aclose()
+
+
 app = FastAPI(
     title="Ovozly API",
     description="Call center analytics and speech processing platform powered by AI",
     version="1.0.0",
+    lifespan=lifespan,
+    default_response_class=ORJSONResponse,
 )
 
 
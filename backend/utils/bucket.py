@@ -5,8 +5,8 @@ Provides functions for uploading files to GCS and generating public URLs.
 Uses Uniform Bucket-Level Access with public bucket IAM for access control.
 """
 
-from io import BytesIO
-from urllib.parse import quote
+from typing import BinaryIO, Optional
+from urllib.parse import quote, unquote
 
 from google.cloud import storage
 from loguru import logger
@@ -56,21 +56,23 @@ def upload_and_make_public(source_file_name: str, dest_name: str) -> str:
 
     # Generate public URL (bucket has uniform bucket-level access with public IAM)
     public_url = get_public_url(settings.BUCKET_NAME, dest_name)
-    logger.debug(f"File uploaded and publicly accessible at {public_url}")
+    logger.debug("File uploaded and publicly accessible at {}", public_url)
 
     return public_url
 
 
 def upload_bytesio_and_make_public(
-    bytes_data: BytesIO, dest_name: str, content_type: str = "audio/mpeg"
+    bytes_data: BinaryIO, dest_name: str, content_type: str = "audio/mpeg"
 ) -> str:
     """
-    Upload a BytesIO object to GCS and return a public URL.
+    Upload a file object to GCS and return a public URL.
 
     Uses Uniform Bucket-Level Access with public bucket IAM for access control.
+    The file is streamed, so an upload's spooled temp file can be passed
+    directly without reading it into memory.
 
     Args:
-        bytes_data: In-memory file data
+        bytes_data: Binary file object (BytesIO, spooled upload file, ...)
         dest_name: Destination blob name in GCS
         content_type: MIME type for the file (default: audio/mpeg)
 
@@ -80,17 +82,45 @@ def upload_bytesio_and_make_public(
     bucket = client.bucket(settings.BUCKET_NAME)
     blob = bucket.blob(dest_name)
 
-    # Upload from BytesIO with content type
+    # Upload from the file object with content type
     blob.upload_from_file(bytes_data, rewind=True, content_type=content_type)
     # rewind=True ensures the stream is at the start
 
     # Generate public URL (bucket has uniform bucket-level access with public IAM)
     public_url = get_public_url(settings.BUCKET_NAME, dest_name)
-    logger.debug(f"File uploaded and publicly accessible at {public_url}")
+    logger.debug("File uploaded and publicly accessible at {}", public_url)
 
     return public_url
 
 
+def _blob_name_from_url(file_url: str) -> Optional[str]:
+    """Extract the blob name from a public URL built by get_public_url()."""
+    # URL format: https://storage.googleapis.com/bucket-name/blob-name
+    parts = file_url.split(settings.BUCKET_NAME + "/", 1)
+    if len(parts) < 2:
+        return None
+
+    # Remove query parameters if any, and undo get_public_url's encoding
+    return unquote(parts[1].split("?")[0])
+
+
+def download_blob_from_url(file_url: str) -> bytes:
+    """
+    Download a blob from GCS using its public URL.
+
+    Args:
+        file_url: The public URL of the file
+
+    Returns:
+        File contents
+    """
+    blob_name = _blob_name_from_url(file_url)
+    if blob_name is None:
+        raise ValueError(f"Could not extract blob name from URL: {file_url}")
+
+    return client.bucket(settings.BUCKET_NAME).blob(blob_name).download_as_bytes()
+
+
 def delete_blob_from_url(file_url: str) -> bool:
     """
     Delete a blob from GCS using its public URL.
@@ -99,24 +129,18 @@ def delete_blob_from_url(file_url: str) -> bool:
         file_url: The public URL of the file
 
     Returns:
-        True if deletion was successful, False otherwise
+        True if the blob was deleted, False if the URL doesn't point into the bucket
+
+    Raises:
+        Exception: Any storage client error (missing blob, network, permissions) is
+            logged and re-raised, so callers such as the gc_blob task can retry
     """
     try:
-        # Extract blob name from URL
-        # URL format: https://storage.googleapis.com/bucket-name/blob-name
-        bucket = client.bucket(settings.BUCKET_NAME)
-
-        # Parse the URL to get the blob name
-        if settings.BUCKET_NAME in file_url:
-            # Extract everything after the bucket name
-            parts = file_url.split(settings.BUCKET_NAME + "/")
-            if len(parts) > 1:
-                # Remove query parameters if any
-                blob_name = parts[1].split("?")[0]
-                blob = bucket.blob(blob_name)
-                blob.delete()
-                logger.info(f"Deleted blob: {blob_name}")
-                return True
+        blob_name = _blob_name_from_url(file_url)
+        if blob_name is not None:
+            client.bucket(settings.BUCKET_NAME).blob(blob_name).delete()
+            logger.info(f"Deleted blob: {blob_name}")
+            return True
 
         logger.warning(f"Could not extract blob name from URL: {file_url}")
         return False
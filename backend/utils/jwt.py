@@ -5,7 +5,7 @@ Provides JWT token creation and validation for authentication.
 """
 
 from datetime import datetime, timedelta, timezone
-from typing import Any, Union
+from typing import Any, Optional, Union
 
 from fastapi import HTTPException, status
 from jose import jwt as _jwt
@@ -25,9 +25,9 @@ class JWT:
     ALGORITHM = "HS256"
 
     @classmethod
-    def _create(cls, key: str, expire_minutes: int, subject: Union[str, Any]) -> str:
+    def _create(cls, key: str, expire_minutes: int, subject: Union[str, Any], **claims: Any) -> str:
         expires_delta = datetime.now(timezone.utc) + timedelta(minutes=expire_minutes)
-        to_encode = {"exp": expires_delta, "sub": subject}
+        to_encode = {"exp": expires_delta, "sub": subject, **claims}
         return _jwt.encode(to_encode, key, cls.ALGORITHM)
 
     @classmethod
@@ -53,8 +53,9 @@ class JWT:
         return token_data
 
     @classmethod
-    def create_access_token(cls, subject: Union[str, Any]) -> str:
-        return cls._create(settings.JWT_KEY, cls.ACCESS_TOKEN_EXPIRE_MINUTES, subject)
+    def create_access_token(cls, subject: Union[str, Any], role: Optional[str] = None) -> str:
+        claims = {"role": role} if role else {}
+        return cls._create(settings.JWT_KEY, cls.ACCESS_TOKEN_EXPIRE_MINUTES, subject, **claims)
 
     @classmethod
     def decode_access_token(cls, token: str) -> TokenPayload:
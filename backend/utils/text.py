@@ -1,4 +1,5 @@
 import os
+from functools import lru_cache
 
 
 def split_text_into_chunks(text: str, chunk_length: int = 2000, threshold: int = 4000) -> list:
@@ -9,6 +10,7 @@ def split_text_into_chunks(text: str, chunk_length: int = 2000, threshold: int =
     return chunks
 
 
+@lru_cache(maxsize=1024)
 def get_extension(filename: str):
     """
     Extracts the extension name from a filename.